@@ -0,0 +1,3 @@
+"""Benchmarks for padi's build phases. Run them from the repository root, for example
+`python -m benchmarks.parse_scaling`.
+"""
@@ -0,0 +1,74 @@
+"""Compare documenting a wheel of a synthetic package in place with extracting it first.
+
+    python -m benchmarks.archive_sources --files 2000
+
+Parsing takes the same time either way, the difference is the extraction that reading in place
+skips.
+"""
+from __future__ import annotations
+import argparse
+import math
+import os
+from pathlib import Path
+import shutil
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import zipfile
+
+from padi.parse import construct_module
+
+from .synthetic import generate_package
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=2_000)
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--docstring-lines", type=int, default=3)
+    parser.add_argument("--annotation-complexity", type=int, default=1)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as temp:
+        package = generate_package(
+            Path(temp),
+            files=args.files,
+            symbols_per_file=args.symbols,
+            docstring_lines=args.docstring_lines,
+            annotation_complexity=args.annotation_complexity,
+        )
+        wheel = Path(temp).joinpath("synthetic-1.0-py3-none-any.whl")
+        with zipfile.ZipFile(wheel, "w", zipfile.ZIP_DEFLATED) as archive:
+            for path in sorted(package.glob("**/*.py")):
+                archive.write(path, path.relative_to(package.parent).as_posix())
+        shutil.rmtree(package)
+
+        cwd = os.getcwd()
+        os.chdir(temp)
+        try:
+            extract = extracted = in_place = math.inf
+            for _ in range(args.repeat):
+                start = perf_counter()
+                with zipfile.ZipFile(wheel.name) as archive:
+                    archive.extractall("extracted")
+                extract = min(extract, perf_counter() - start)
+                construct_module(f"extracted/{package.name}", jobs=args.jobs)
+                shutil.rmtree("extracted")
+                extracted = min(extracted, perf_counter() - start)
+
+                start = perf_counter()
+                construct_module(wheel.name, jobs=args.jobs)
+                in_place = min(in_place, perf_counter() - start)
+        finally:
+            os.chdir(cwd)
+
+        size = wheel.stat().st_size
+
+    print(f"{'files':>10} {args.files}")
+    print(f"{'wheel':>10} {size / 2**20:.2f} MiB")
+    print(f"{'extract':>10} {extract:.3f}s")
+    print(f"{'extracted':>10} {extracted:.3f}s including the extraction")
+    print(f"{'in place':>10} {in_place:.3f}s")
+
+if __name__ == "__main__":
+    main()
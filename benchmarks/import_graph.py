@@ -0,0 +1,62 @@
+"""Time building the import graph of a synthetic package.
+
+    python -m benchmarks.import_graph --files 5000 --imports 8
+"""
+from __future__ import annotations
+import argparse
+import math
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from padi.imports import ImportGraph
+from padi.parse import construct_module
+
+from .synthetic import generate_package
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=5_000)
+    parser.add_argument("--imports", type=int, default=8, help="Imports of every file.")
+    parser.add_argument("--symbols", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as temp:
+        package = generate_package(
+            Path(temp),
+            files=args.files,
+            symbols_per_file=args.symbols,
+            imports_per_file=args.imports,
+        )
+        cwd = os.getcwd()
+        os.chdir(package.parent)
+        try:
+            start = perf_counter()
+            module = construct_module(package.name)
+            parse = perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+    steps = {"build": math.inf, "cycles": math.inf, "loads": math.inf, "json": math.inf}
+    for _ in range(args.repeat):
+        start = perf_counter()
+        graph = ImportGraph(module)
+        steps["build"] = min(steps["build"], perf_counter() - start)
+        actions = {"cycles": graph.cycles, "loads": graph.loads, "json": graph.to_json}
+        for step, action in actions.items():
+            start = perf_counter()
+            action()
+            steps[step] = min(steps[step], perf_counter() - start)
+    cycles = graph.cycles()
+
+    print(f"{'files':>10} {len(graph.files)}")
+    print(f"{'imports':>10} {sum(len(targets) for targets in graph.edges.values())}")
+    print(f"{'cycles':>10} {len(cycles)} (largest {max(map(len, cycles), default=0)} files)")
+    print(f"{'parse':>10} {parse:.3f}s")
+    for step, seconds in steps.items():
+        print(f"{step:>10} {seconds:.3f}s")
+
+if __name__ == "__main__":
+    main()
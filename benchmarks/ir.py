@@ -0,0 +1,68 @@
+"""Compare loading the IR of a synthetic package with parsing it.
+
+    python -m benchmarks.ir --files 5000
+"""
+from __future__ import annotations
+import argparse
+import math
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from padi.ir import dump_ir, load_ir
+from padi.parse import construct_module
+
+from .synthetic import generate_package
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=5_000)
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--docstring-lines", type=int, default=3)
+    parser.add_argument("--annotation-complexity", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as temp:
+        package = generate_package(
+            Path(temp),
+            files=args.files,
+            symbols_per_file=args.symbols,
+            docstring_lines=args.docstring_lines,
+            annotation_complexity=args.annotation_complexity,
+            imports_per_file=3,
+        )
+        ir = Path(temp).joinpath("synthetic.padi-ir")
+        sources = sum(path.stat().st_size for path in package.glob("**/*.py"))
+
+        cwd = os.getcwd()
+        os.chdir(package.parent)
+        try:
+            parse = dump = load = math.inf
+            for _ in range(args.repeat):
+                start = perf_counter()
+                module = construct_module(package.name)
+                parse = min(parse, perf_counter() - start)
+
+                start = perf_counter()
+                dump_ir(module, ir)
+                dump = min(dump, perf_counter() - start)
+
+                start = perf_counter()
+                load_ir(ir)
+                load = min(load, perf_counter() - start)
+        finally:
+            os.chdir(cwd)
+
+        size = ir.stat().st_size
+
+    print(f"{'files':>10} {args.files}")
+    print(f"{'sources':>10} {sources / 2**20:.2f} MiB")
+    print(f"{'ir':>10} {size / 2**20:.2f} MiB")
+    print(f"{'parse':>10} {parse:.3f}s")
+    print(f"{'dump':>10} {dump:.3f}s")
+    print(f"{'load':>10} {load:.3f}s ({parse / load:.1f}x faster than parsing)")
+
+if __name__ == "__main__":
+    main()
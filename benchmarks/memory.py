@@ -0,0 +1,105 @@
+"""Peak memory (RSS) of documenting a large package, with and without `low_memory`.
+
+    python -m benchmarks.memory --files 10000
+    python -m benchmarks.memory --files 1000 --phase build
+
+Every measurement runs in a fresh process so the peaks don't include each other. Unix only.
+"""
+from __future__ import annotations
+import argparse
+import os
+from pathlib import Path
+import resource
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from .synthetic import generate_package
+
+def _peak_rss() -> int:
+    """Peak resident set size of the current process in bytes."""
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes while macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def _run(package: str, out: str, phase: str, low_memory: bool):
+    """Document the package in this process and print the files, peak rss, and seconds taken."""
+
+    from padi.parse import construct_module
+    from padi.compile.documentation import build_docs
+
+    start = perf_counter()
+    module = construct_module(package)
+    if phase == "build":
+        build_docs(module, package, out=out, low_memory=low_memory)
+    files = sum(1 for _ in module.all_files())
+    print(files, _peak_rss(), perf_counter() - start)
+
+def _measure(package: Path, out: Path, phase: str, low_memory: bool) -> tuple[int, int, float]:
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.memory",
+        "--child",
+        phase,
+        "--package",
+        package.name,
+        "--out",
+        str(out),
+    ]
+    if low_memory:
+        command.append("--low-memory")
+
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([os.getcwd(), *sys.path[1:]])}
+    result = subprocess.run(
+        command,
+        cwd=package.parent,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    files, peak, seconds = result.stdout.strip().splitlines()[-1].split()
+    return int(files), int(peak), float(seconds)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument(
+        "--phase",
+        choices=["parse", "build"],
+        default="parse",
+        help="Only build the module tree or also render every page. Rendering takes too long to "
+        "run at the default number of files.",
+    )
+    parser.add_argument("--child", choices=["parse", "build"], help=argparse.SUPPRESS)
+    parser.add_argument("--package", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    parser.add_argument("--low-memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        _run(args.package, args.out, args.child, args.low_memory)
+        return
+
+    with TemporaryDirectory() as temp:
+        package = generate_package(Path(temp), files=args.files, symbols_per_file=args.symbols)
+        modes = [False] if args.phase == "parse" else [False, True]
+        print(f"{'phase':>6} {'low memory':>11} {'files':>7} {'peak MiB':>9} {'seconds':>9}")
+        for low_memory in modes:
+            files, peak, seconds = _measure(
+                package,
+                Path(temp).joinpath("docs"),
+                args.phase,
+                low_memory,
+            )
+            print(
+                f"{args.phase:>6} {str(low_memory):>11} {files:>7} "
+                f"{peak / 2**20:>9.1f} {seconds:>9.2f}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Parse phase speedup of `construct_module` against the number of worker processes.
+
+    python -m benchmarks.parse_scaling --files 10000
+"""
+from __future__ import annotations
+import argparse
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from padi.parse import construct_module
+
+from .synthetic import generate_package
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    cores = args.max_jobs
+    jobs = sorted({1, *[2**power for power in range(1, cores.bit_length())], cores})
+
+    with TemporaryDirectory() as temp:
+        package = generate_package(Path(temp), files=args.files, symbols_per_file=args.symbols)
+        cwd = os.getcwd()
+        os.chdir(package.parent)
+        try:
+            baseline = None
+            print(f"{'jobs':>6} {'seconds':>10} {'speedup':>8}")
+            for job_count in jobs:
+                best = min(
+                    _time(lambda: construct_module(package.name, jobs=job_count))
+                    for _ in range(args.repeat)
+                )
+                baseline = baseline or best
+                print(f"{job_count:>6} {best:>10.3f} {baseline / best:>7.2f}x")
+        finally:
+            os.chdir(cwd)
+
+def _time(action) -> float:
+    start = perf_counter()
+    action()
+    return perf_counter() - start
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Time every phase of building the docs of a synthetic package and report them as JSON.
+
+    python -m benchmarks.phases --depth 2 --files-per-module 5 --output phases.json
+
+Each phase is timed on its own so a regression can be traced to the phase that caused it. The
+render phases run the same steps as a build, one page at a time.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+from pathlib import Path
+import platform
+import sys
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from padi import __version__
+from padi.compile import documentation
+from padi.compile.documentation import (
+    _build_file,
+    _fix_urls,
+    _get_components,
+    _load_template,
+    _page_path,
+    _pages,
+    _restore_sys_path,
+    _url_root,
+    _write_page,
+    highlight_file,
+    phml,
+)
+from padi.nodes import Class, File
+from padi.nodes.docstrings import DocstringCache
+from padi.nodes.file_system import extract, read_source
+from padi.parse import construct_module, find_files
+
+from .synthetic import generate_package
+
+PHASES = [
+    "discover",
+    "read",
+    "extract",
+    "construct_module",
+    "docstrings",
+    "highlight",
+    "compile",
+    "fix_urls",
+    "render",
+    "write",
+]
+"""Every phase that is timed in the order they run during a build."""
+
+class Timer:
+    """Total seconds and number of runs of each phase."""
+
+    def __init__(self) -> None:
+        self.seconds = {phase: 0.0 for phase in PHASES}
+        self.counts = {phase: 0 for phase in PHASES}
+
+    def time(self, phase: str, action):
+        start = perf_counter()
+        result = action()
+        self.seconds[phase] += perf_counter() - start
+        self.counts[phase] += 1
+        return result
+
+    def results(self) -> dict:
+        return {
+            phase: {
+                "seconds": round(self.seconds[phase], 6),
+                "count": self.counts[phase],
+                "mean": round(self.seconds[phase] / max(1, self.counts[phase]), 6),
+            }
+            for phase in PHASES
+        }
+
+def _docstrings_of(file: File) -> list[str]:
+    found = [file.docstring]
+
+    def add(objects: list):
+        for obj in objects:
+            found.append(obj.docstring)
+            if isinstance(obj, Class):
+                add([*obj.attributes, *obj.methods, *obj.classes])
+
+    add(file.objects)
+    return found
+
+def run(package: Path, out: Path, *, root: str = "", max_pages: int | None = None) -> dict:
+    """Time every phase of documenting the package. The current directory must be the packages
+    parent directory.
+    """
+
+    timer = Timer()
+    files = timer.time("discover", lambda: find_files(package.name))
+    sources = [timer.time("read", lambda: read_source(file)) for file in files]
+    for file, source in zip(files, sources):
+        timer.time("extract", lambda: extract(source, file))
+    module = timer.time("construct_module", lambda: construct_module(package.name))
+
+    # Render every docstring with an empty cache so nothing from a previous phase is reused
+    cache = DocstringCache()
+    for file in module.all_files():
+        for docstring in _docstrings_of(file):
+            timer.time("docstrings", lambda: cache.render(docstring))
+
+    documentation._highlights.clear()
+    _get_components("")
+    template = _load_template(Path(documentation.__file__).parent.joinpath("module.phml"))
+    website_root = _url_root(root)
+    pages = list(_pages(module))[:max_pages]
+    for parent, file in pages:
+        timer.time("highlight", lambda: highlight_file(file))
+        with _restore_sys_path():
+            ast = timer.time(
+                "compile",
+                lambda: _build_file(parent, file, template, package.name, "1"),
+            )
+            phml.ast = timer.time("fix_urls", lambda: _fix_urls(ast, website_root))
+            content = timer.time("render", phml.render)
+            phml.ast = None
+        timer.time("write", lambda: _write_page(out.joinpath(_page_path(file)), content))
+
+    return {
+        "files": len(files),
+        "pages": len(pages),
+        "phases": timer.results(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--modules-per-level", type=int, default=5)
+    parser.add_argument("--files-per-module", type=int, default=5)
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--docstring-lines", type=int, default=5)
+    parser.add_argument("--annotation-complexity", type=int, default=1)
+    parser.add_argument("--root", default="docs", help="Website root the urls are prefixed with.")
+    parser.add_argument("--max-pages", type=int, help="Only render the first pages.")
+    parser.add_argument("--output", help="File to write the JSON results to. Defaults to stdout.")
+    args = parser.parse_args()
+
+    config = {
+        "depth": args.depth,
+        "modules_per_level": args.modules_per_level,
+        "files_per_module": args.files_per_module,
+        "symbols_per_file": args.symbols,
+        "docstring_lines": args.docstring_lines,
+        "annotation_complexity": args.annotation_complexity,
+    }
+
+    with TemporaryDirectory() as temp:
+        package = generate_package(
+            Path(temp),
+            depth=args.depth,
+            modules_per_level=args.modules_per_level,
+            files_per_module=args.files_per_module,
+            symbols_per_file=args.symbols,
+            docstring_lines=args.docstring_lines,
+            annotation_complexity=args.annotation_complexity,
+        )
+        cwd = os.getcwd()
+        os.chdir(package.parent)
+        try:
+            results = run(
+                package,
+                Path(temp).joinpath("docs"),
+                root=args.root,
+                max_pages=args.max_pages,
+            )
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "padi": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        **results,
+    }
+
+    for phase, result in report["phases"].items():
+        print(f"{phase:>17} {result['seconds']:>10.3f}s {result['count']:>7}", file=sys.stderr)
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Build time and size of the search index of a synthetic package.
+
+    python -m benchmarks.search_index --symbols 100000
+"""
+from __future__ import annotations
+import argparse
+import gzip
+import math
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from padi.compile.documentation.search import SearchIndex
+from padi.parse import construct_module
+
+from .synthetic import generate_package
+
+def _symbols_per_file(symbols: int) -> int:
+    # Every synthetic class also documents an attribute and a method
+    classes = len([symbol for symbol in range(symbols) if symbol % 3 == 1])
+    return symbols + 2 * classes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=100_000, help="Total symbols to index.")
+    parser.add_argument("--symbols-per-file", type=int, default=10)
+    parser.add_argument("--docstring-lines", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    files = math.ceil(args.symbols / _symbols_per_file(args.symbols_per_file))
+    with TemporaryDirectory() as temp:
+        package = generate_package(
+            Path(temp),
+            files=files,
+            symbols_per_file=args.symbols_per_file,
+            docstring_lines=args.docstring_lines,
+        )
+        cwd = os.getcwd()
+        os.chdir(package.parent)
+        try:
+            module = construct_module(package.name)
+        finally:
+            os.chdir(cwd)
+
+        build = serialize = math.inf
+        for _ in range(args.repeat):
+            start = perf_counter()
+            index = SearchIndex(module)
+            built = perf_counter()
+            output = index.files()
+            build = min(build, built - start)
+            serialize = min(serialize, perf_counter() - built)
+
+    term_shards = [content for path, content in output.items() if path.startswith("terms/")]
+    sizes = [len(content.encode("utf-8")) for content in output.values()]
+    compressed = [len(gzip.compress(content.encode("utf-8"))) for content in output.values()]
+
+    print(f"{'files':>22} {files}")
+    print(f"{'documents':>22} {len(index.docs)}")
+    print(f"{'terms':>22} {len(index.postings)}")
+    print(f"{'term shards':>22} {len(term_shards)}")
+    print(f"{'build':>22} {build:.3f}s")
+    print(f"{'serialize':>22} {serialize:.3f}s")
+    print(f"{'total size':>22} {sum(sizes) / 2**20:.2f} MiB ({sum(compressed) / 2**20:.2f} gzip)")
+    print(f"{'largest term shard':>22} {max(len(shard) for shard in term_shards) / 2**10:.1f} KiB")
+    print(f"{'index.json':>22} {len(output['index.json']) / 2**10:.1f} KiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Generate synthetic python packages to benchmark padi against."""
+from __future__ import annotations
+from pathlib import Path
+
+__all__ = [
+    "generate_package"
+]
+
+def _annotation(complexity: int) -> str:
+    """An annotation nested `complexity` levels deep."""
+
+    annotation = "int"
+    for _ in range(complexity):
+        annotation = f"dict[str, tuple[{annotation}, str]] | None"
+    return annotation
+
+def _docstring(summary: str, lines: int, indent: str) -> str:
+    body = [
+        f"{indent}Line {line} of the description with `code`, *emphasis*, and a [[link]]."
+        for line in range(lines - 1)
+    ]
+    if len(body) == 0:
+        return f'{indent}"""{summary}"""'
+    return "\n".join([f'{indent}"""{summary}', "", *body, f'{indent}"""'])
+
+def _source(
+    index: int,
+    symbols: int,
+    docstring_lines: int = 1,
+    annotations: int = 0,
+    imports: list[str] | None = None,
+) -> str:
+    annotation = _annotation(annotations)
+    lines = [
+        _docstring(f"Synthetic module number {index}.", docstring_lines, ""),
+        "from __future__ import annotations",
+        *(imports or []),
+        "",
+    ]
+    for symbol in range(symbols):
+        kind = symbol % 3
+        if kind == 0:
+            lines.extend([
+                f"def function_{symbol}(value: {annotation}, *args, name: str = 'x', **kwargs)"
+                " -> int:",
+                _docstring(f"Function {symbol}.", docstring_lines, "    "),
+                "    return value",
+                "",
+            ])
+        elif kind == 1:
+            lines.extend([
+                f"class Class{symbol}(object):",
+                _docstring(f"Class {symbol}.", docstring_lines, "    "),
+                f"    attribute: {annotation} = 0",
+                "",
+                f"    def method(self, other: {annotation} = None) -> None:",
+                _docstring("Method.", docstring_lines, "        "),
+                "",
+            ])
+        else:
+            lines.extend([
+                f"variable_{symbol}: {annotation} = {symbol}",
+                _docstring(f"Variable {symbol}.", docstring_lines, ""),
+                "",
+            ])
+    return "\n".join(lines)
+
+def _relative(module: Path, target: Path) -> str:
+    """Relative import of the target package from a file in the module."""
+
+    common = 0
+    for part, other in zip(module.parts, target.parts):
+        if part != other:
+            break
+        common += 1
+    return "." * (len(module.parts) - common + 1) + ".".join(target.parts[common:])
+
+def _imported(name: str) -> str:
+    return "*" if name == "__init__" else name
+
+def generate_package(
+    root: Path,
+    name: str = "synthetic",
+    *,
+    files: int = 10_000,
+    depth: int = 2,
+    modules_per_level: int = 10,
+    symbols_per_file: int = 10,
+    files_per_module: int | None = None,
+    docstring_lines: int = 1,
+    annotation_complexity: int = 0,
+    imports_per_file: int = 0,
+) -> Path:
+    """Write a package with roughly `files` python files spread evenly over a tree of modules
+    `depth` levels deep. Returns the path to the package.
+
+    If `files_per_module` is given every module gets that many files besides its `__init__.py` and
+    `files` is ignored. `docstring_lines` is the length of every docstring and
+    `annotation_complexity` is how deeply the annotations of every symbol are nested.
+
+    Every file imports `imports_per_file` other files of the package, spread across the package
+    with a fixed stride so the import graph has long chains and cycles. Every other import is
+    relative.
+    """
+
+    modules = [Path(name)]
+    level = [Path(name)]
+    for _ in range(depth):
+        level = [parent.joinpath(f"sub_{i}") for parent in level for i in range(modules_per_level)]
+        modules.extend(level)
+
+    if files_per_module is not None:
+        files = len(modules) * (files_per_module + 1)
+
+    per_module = max(0, files - len(modules)) // len(modules)
+    extra = max(0, files - len(modules)) % len(modules)
+    index = 0
+
+    paths = []
+    for position, module in enumerate(modules):
+        paths.append((module, "__init__"))
+        for file in range(per_module + (1 if position < extra else 0)):
+            paths.append((module, f"file_{file}"))
+
+    def source() -> str:
+        module = paths[index][0]
+        imports = []
+        for number in range(imports_per_file):
+            target, name = paths[(index * 7 + number * 131 + 1) % len(paths)]
+            if number % 2 == 1:
+                imports.append(f"from {_relative(module, target)} import {_imported(name)}")
+            elif name == "__init__":
+                imports.append(f"import {'.'.join(target.parts)}")
+            else:
+                imports.append(f"from {'.'.join(target.parts)} import {name}")
+        return _source(index, symbols_per_file, docstring_lines, annotation_complexity, imports)
+
+    for position, module in enumerate(modules):
+        directory = root.joinpath(module)
+        directory.mkdir(parents=True, exist_ok=True)
+        directory.joinpath("__init__.py").write_text(source())
+        index += 1
+        for file in range(per_module + (1 if position < extra else 0)):
+            directory.joinpath(f"file_{file}.py").write_text(source())
+            index += 1
+    return root.joinpath(name)
@@ -1,8 +1,14 @@
+import json
+import sys
+
 import click
 
-from . import __version__
+from . import __version__, profiling
 from .parse import construct_module
-from .compile.documentation import build_docs
+from .compile.documentation import Package, build_docs, build_packages, duplicate_names
+from .imports import ImportGraph
+from .ir import dump_ir, load_ir
+from .watch import watch as watch_docs
 
 @click.group(invoke_without_command=True)
 def cli(version: bool):
@@ -11,7 +17,31 @@ def cli(version: bool):
     if version:
         print(f"pyAPI v{__version__}")
 
-@click.argument("module", default="")
+def _read_config(path: str) -> tuple[str, list[tuple[str, str, str]]]:
+    """Read the title and packages of a multi package build from a json config file.
+
+    ```json
+    {
+        "title": "Internal packages",
+        "packages": ["package_a", {"module": "package_b", "name": "b", "version": "2.0"}]
+    }
+    ```
+
+    Each package is its module and optionally the name of its directory in the output and its
+    version.
+    """
+
+    with open(path, "r", encoding="utf-8") as file:
+        config = json.load(file)
+
+    packages = []
+    for package in config.get("packages", []):
+        if isinstance(package, str):
+            package = {"module": package}
+        packages.append((package["module"], package.get("name", ""), package.get("version", "1")))
+    return config.get("title", ""), packages
+
+@click.argument("modules", nargs=-1)
 @click.option("-v", "--version", flag_value=True, help="Version of the Documenter", default=False)
 @click.option("-o", "--output", help="Output directory of the files.", default="docs/")
 @click.option("-r", "--root", help="Root directory of the docs. Used for href generation.", default="")
@@ -21,17 +51,507 @@ def cli(version: bool):
     help="Directory where the layout phml files are located", 
     default=""
 )
+@click.option(
+    "-c",
+    "--cache-dir",
+    help="Directory to cache parsed python files in. Unchanged files are not parsed again.",
+    default=""
+)
+@click.option(
+    "-i",
+    "--incremental",
+    flag_value=True,
+    help="Keep the previous output and only rebuild the pages that changed.",
+    default=False
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=int,
+    help="Number of processes used to parse files and render pages. 0 uses one per cpu.",
+    default=1
+)
+@click.option(
+    "--low-memory",
+    flag_value=True,
+    help="Use less memory on large packages by not keeping derived data for the whole build.",
+    default=False
+)
+@click.option(
+    "--precompress",
+    flag_value=True,
+    help="Write a gzip compressed .gz copy of every page and asset next to it.",
+    default=False
+)
+@click.option(
+    "--include",
+    multiple=True,
+    help="Glob of the files to document. Can be given multiple times.",
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    help="Glob of the files and directories to skip. Can be given multiple times.",
+)
+@click.option(
+    "--no-gitignore",
+    flag_value=True,
+    help="Don't skip the files and directories ignored by .gitignore files.",
+    default=False
+)
+@click.option(
+    "-w",
+    "--watch",
+    flag_value=True,
+    help="Rebuild the changed pages whenever the module or layouts change.",
+    default=False
+)
+@click.option(
+    "-s",
+    "--serve",
+    flag_value=True,
+    help="Serve the docs on localhost. Open pages reload after every rebuild.",
+    default=False
+)
+@click.option("-p", "--port", type=int, help="Port to serve the docs on.", default=8000)
+@click.option(
+    "--config",
+    help="Json file listing the packages to document together.",
+    default=""
+)
+@click.option(
+    "-t",
+    "--title",
+    help="Title of the index page when documenting more than one package.",
+    default=""
+)
+@click.option(
+    "--profile",
+    help="Write a Chrome trace of every build phase and page to this file.",
+    default=""
+)
+@click.option(
+    "--profile-top",
+    type=int,
+    help="Number of the slowest pages to list on stderr when profiling.",
+    default=10
+)
 @click.command()
-def documentation(module: str,  output: str, root: str, layouts: str, version: bool) -> dict:
+def documentation(
+    modules: tuple[str, ...],
+    output: str,
+    root: str,
+    layouts: str,
+    cache_dir: str,
+    incremental: bool,
+    jobs: int,
+    low_memory: bool,
+    precompress: bool,
+    include: tuple[str, ...],
+    exclude: tuple[str, ...],
+    no_gitignore: bool,
+    watch: bool,
+    serve: bool,
+    port: int,
+    profile: str,
+    profile_top: int,
+    config: str,
+    title: str,
+    version: bool
+) -> None:
+    """Document a module. With more than one module, or a config file listing packages, every
+    package is documented in a directory of its own along with an index page linking to them.
+
+    A module is a directory, a wheel, zip, or tar archive which is read without extracting it, or
+    the import name of an installed package.
+    """
+
     if version:
         print(f"pyAPI v{__version__}")
         exit()
 
+    packages = [(module, "", "1") for module in modules]
+    if config != "":
+        config_title, config_packages = _read_config(config)
+        title = title or config_title
+        packages.extend(config_packages)
+    multiple = len(packages) > 1 or config != ""
+    module = packages[0][0] if len(packages) > 0 else ""
+
+    if multiple and (watch or serve):
+        raise click.UsageError("--watch and --serve only support a single module.")
+
+    if watch or serve:
+        watch_docs(
+            module,
+            module,
+            out=output,
+            root=root,
+            user_templates=layouts,
+            cache_dir=cache_dir,
+            jobs=jobs,
+            low_memory=low_memory,
+            include=include,
+            exclude=exclude,
+            gitignore=not no_gitignore,
+            rebuild=watch,
+            serve=serve,
+            port=port
+        )
+        return
+
+    if profile != "":
+        profiling.start()
+
+    if multiple:
+        _document_packages(
+            packages,
+            title,
+            output=output,
+            root=root,
+            layouts=layouts,
+            cache_dir=cache_dir,
+            incremental=incremental,
+            jobs=jobs,
+            low_memory=low_memory,
+            precompress=precompress,
+            include=include,
+            exclude=exclude,
+            gitignore=not no_gitignore,
+        )
+        _save_profile(profile, profile_top)
+        return
+
     # Parse data from found python files
-    project_module = construct_module(module)
+    with profiling.span("construct_module"):
+        project_module = construct_module(
+            module,
+            cache_dir=cache_dir,
+            jobs=jobs,
+            include=include,
+            exclude=exclude,
+            gitignore=not no_gitignore
+        )
 
     # Build docs from phml templates
-    build_docs(project_module, module, root=root, user_templates=layouts)
+    build_docs(
+        project_module,
+        project_module.name,
+        out=output,
+        root=root,
+        user_templates=layouts,
+        incremental=incremental,
+        jobs=jobs,
+        cache_dir=cache_dir,
+        low_memory=low_memory,
+        precompress=precompress
+    )
+
+    _save_profile(profile, profile_top)
+
+def _document_packages(
+    packages: list[tuple[str, str, str]],
+    title: str,
+    *,
+    output: str,
+    root: str,
+    layouts: str,
+    cache_dir: str,
+    incremental: bool,
+    jobs: int,
+    low_memory: bool,
+    precompress: bool,
+    include: tuple[str, ...],
+    exclude: tuple[str, ...],
+    gitignore: bool,
+):
+    parsed = []
+    for module, name, package_version in packages:
+        with profiling.span("construct_module", module=module):
+            project_module = construct_module(
+                module,
+                cache_dir=cache_dir,
+                jobs=jobs,
+                include=include,
+                exclude=exclude,
+                gitignore=gitignore
+            )
+        parsed.append(Package(project_module, name, package_version))
+    _check_names(parsed)
+
+    build_packages(
+        parsed,
+        title,
+        out=output,
+        root=root,
+        user_templates=layouts,
+        incremental=incremental,
+        jobs=jobs,
+        cache_dir=cache_dir,
+        low_memory=low_memory,
+        precompress=precompress
+    )
+
+def _check_names(packages: list[Package]):
+    duplicates = duplicate_names(packages)
+    if len(duplicates) > 0:
+        raise click.UsageError(
+            f"More than one package is named {', '.join(duplicates)}. Give them unique names "
+            "with a --config file."
+        )
+
+def _save_profile(profile: str, top: int):
+    profiler = profiling.stop()
+    if profiler is not None:
+        profiler.save(profile)
+        print(profiler.summary(top), file=sys.stderr)
+        print(f"Wrote profile to {profile}", file=sys.stderr)
+
+@click.argument("module", default="")
+@click.option(
+    "-f",
+    "--format",
+    "output_format",
+    type=click.Choice(["json", "dot"]),
+    help="Format of the graph.",
+    default="json"
+)
+@click.option("-o", "--output", help="File to write the graph to. Defaults to stdout.", default="")
+@click.option(
+    "-c",
+    "--cache-dir",
+    help="Directory to cache parsed python files in. Unchanged files are not parsed again.",
+    default=""
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=int,
+    help="Number of processes used to parse files. 0 uses one per cpu.",
+    default=1
+)
+@click.option(
+    "--include",
+    multiple=True,
+    help="Glob of the files to include. Can be given multiple times.",
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    help="Glob of the files and directories to skip. Can be given multiple times.",
+)
+@click.option(
+    "--no-gitignore",
+    flag_value=True,
+    help="Don't skip the files and directories ignored by .gitignore files.",
+    default=False
+)
+@click.option(
+    "--top",
+    type=int,
+    help="Number of the most imported and most importing files to list on stderr.",
+    default=10
+)
+@click.command()
+def graph(
+    module: str,
+    output_format: str,
+    output: str,
+    cache_dir: str,
+    jobs: int,
+    include: tuple[str, ...],
+    exclude: tuple[str, ...],
+    no_gitignore: bool,
+    top: int,
+):
+    """Dependency graph of the imports between the files of a module."""
+
+    project_module = construct_module(
+        module,
+        cache_dir=cache_dir,
+        jobs=jobs,
+        include=include,
+        exclude=exclude,
+        gitignore=not no_gitignore
+    )
+    imports = ImportGraph(project_module)
+    content = imports.to_json() if output_format == "json" else imports.to_dot()
+
+    if output != "":
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(content + "\n")
+    else:
+        print(content)
+    print(imports.summary(top), file=sys.stderr)
+
+@click.argument("module", default="")
+@click.option("-o", "--output", help="File to write the IR to.", default="module.padi-ir")
+@click.option(
+    "-c",
+    "--cache-dir",
+    help="Directory to cache parsed python files in. Unchanged files are not parsed again.",
+    default=""
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=int,
+    help="Number of processes used to parse files. 0 uses one per cpu.",
+    default=1
+)
+@click.option(
+    "--include",
+    multiple=True,
+    help="Glob of the files to document. Can be given multiple times.",
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    help="Glob of the files and directories to skip. Can be given multiple times.",
+)
+@click.option(
+    "--no-gitignore",
+    flag_value=True,
+    help="Don't skip the files and directories ignored by .gitignore files.",
+    default=False
+)
+@click.command()
+def extract(
+    module: str,
+    output: str,
+    cache_dir: str,
+    jobs: int,
+    include: tuple[str, ...],
+    exclude: tuple[str, ...],
+    no_gitignore: bool,
+):
+    """Parse a module and write everything needed to document it to an IR file. Render it with
+    `padi-render` without parsing the module again.
+    """
+
+    project_module = construct_module(
+        module,
+        cache_dir=cache_dir,
+        jobs=jobs,
+        include=include,
+        exclude=exclude,
+        gitignore=not no_gitignore
+    )
+    dump_ir(project_module, output)
+
+@click.argument("irs", nargs=-1, required=True)
+@click.option("-o", "--output", help="Output directory of the files.", default="docs/")
+@click.option("-r", "--root", help="Root directory of the docs. Used for href generation.", default="")
+@click.option(
+    "-l",
+    "--layouts",
+    help="Directory where the layout phml files are located",
+    default=""
+)
+@click.option(
+    "-c",
+    "--cache-dir",
+    help="Directory to cache rendered docstrings in.",
+    default=""
+)
+@click.option(
+    "-i",
+    "--incremental",
+    flag_value=True,
+    help="Keep the previous output and only rebuild the pages that changed.",
+    default=False
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=int,
+    help="Number of processes used to render pages. 0 uses one per cpu.",
+    default=1
+)
+@click.option(
+    "--low-memory",
+    flag_value=True,
+    help="Use less memory on large packages by not keeping derived data for the whole build.",
+    default=False
+)
+@click.option(
+    "--precompress",
+    flag_value=True,
+    help="Write a gzip compressed .gz copy of every page and asset next to it.",
+    default=False
+)
+@click.option(
+    "-t",
+    "--title",
+    help="Title of the index page when rendering more than one IR.",
+    default=""
+)
+@click.option(
+    "--profile",
+    help="Write a Chrome trace of every build phase and page to this file.",
+    default=""
+)
+@click.option(
+    "--profile-top",
+    type=int,
+    help="Number of the slowest pages to list on stderr when profiling.",
+    default=10
+)
+@click.command()
+def render(
+    irs: tuple[str, ...],
+    output: str,
+    root: str,
+    layouts: str,
+    cache_dir: str,
+    incremental: bool,
+    jobs: int,
+    low_memory: bool,
+    precompress: bool,
+    title: str,
+    profile: str,
+    profile_top: int,
+):
+    """Build the docs from IR files written by `padi-extract`. More than one IR is documented the
+    same as passing many modules to `padi`.
+    """
+
+    if profile != "":
+        profiling.start()
+
+    with profiling.span("load_ir"):
+        modules = [load_ir(ir) for ir in irs]
+
+    if len(modules) > 1:
+        packages = [Package(module) for module in modules]
+        _check_names(packages)
+        build_packages(
+            packages,
+            title,
+            out=output,
+            root=root,
+            user_templates=layouts,
+            incremental=incremental,
+            jobs=jobs,
+            cache_dir=cache_dir,
+            low_memory=low_memory,
+            precompress=precompress
+        )
+    else:
+        build_docs(
+            modules[0],
+            modules[0].name,
+            out=output,
+            root=root,
+            user_templates=layouts,
+            incremental=incremental,
+            jobs=jobs,
+            cache_dir=cache_dir,
+            low_memory=low_memory,
+            precompress=precompress
+        )
+
+    _save_profile(profile, profile_top)
 
 if __name__ == "__main__":
     documentation()
\ No newline at end of file
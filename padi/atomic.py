@@ -0,0 +1,25 @@
+from __future__ import annotations
+from contextlib import contextmanager
+import os
+from pathlib import Path
+from typing import Iterator
+
+__all__ = [
+    "replacing",
+]
+
+@contextmanager
+def replacing(path: str | Path) -> Iterator[Path]:
+    """A temp path to write instead of `path`. Once written it replaces `path` in a single rename
+    so anything reading the file never sees it partially written. The temp file is removed if
+    writing it fails.
+    """
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        yield temp
+        os.replace(temp, path)
+    finally:
+        temp.unlink(missing_ok=True)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+import hashlib
+import pickle
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+from . import __version__
+from .atomic import replacing
+from .nodes.file_system import FileModel, extract, source_digest
+
+if TYPE_CHECKING:
+    from .sources import SourceProvider
+
+__all__ = [
+    "CACHE_FORMAT",
+    "ParseCache"
+]
+
+CACHE_FORMAT = 1
+"""Layout of the cache entries. Bumped whenever `FileModel` or the objects stored in it change
+so entries that still unpickle with the old layout aren't served.
+"""
+
+class ParseCache:
+    """On disk cache of extracted file models.
+
+    Entries are keyed by the source files path and validated against its size, mtime, and content
+    hash. Files that come from a provider, like the members of an archive, are keyed and stat'ed
+    through it instead. Entries written by a different version of padi or with a different
+    `CACHE_FORMAT` are ignored and replaced.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key: str) -> Path:
+        key = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.path.joinpath(f"{key}.pickle")
+
+    def _read(self, entry_path: Path) -> dict | None:
+        try:
+            with open(entry_path, "rb") as file:
+                entry = pickle.load(file)
+        except (
+            OSError,
+            pickle.UnpicklingError,
+            EOFError,
+            AttributeError,
+            ImportError,
+            TypeError,
+        ):
+            return None
+
+        if (
+            not isinstance(entry, dict)
+            or entry.get("version") != __version__
+            or entry.get("format") != CACHE_FORMAT
+        ):
+            return None
+        return entry
+
+    def _write(self, entry_path: Path, entry: dict):
+        with replacing(entry_path) as temp:
+            with open(temp, "wb") as file:
+                pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def fetch(
+        self,
+        full_path: Path,
+        read: Callable[[], str],
+        provider: SourceProvider | None = None,
+    ) -> FileModel:
+        """Get the extracted model for a file. The source is only read, with `read`, when the files
+        size or mtime changed and is only parsed when its content hash changed.
+        """
+
+        if provider is not None:
+            size, mtime = provider.stat(full_path)
+            entry_path = self._entry_path(provider.key(full_path))
+        else:
+            stat = full_path.stat()
+            size, mtime = stat.st_size, stat.st_mtime_ns
+            entry_path = self._entry_path(full_path.resolve().as_posix())
+        entry = self._read(entry_path)
+
+        if entry is not None and entry["size"] == size and entry["mtime"] == mtime:
+            self.hits += 1
+            return entry["model"]
+
+        source = read()
+        if entry is not None and entry["model"].digest == source_digest(source):
+            self.hits += 1
+            model = entry["model"]
+        else:
+            self.misses += 1
+            model = extract(source, full_path)
+
+        self._write(
+            entry_path,
+            {
+                "version": __version__,
+                "format": CACHE_FORMAT,
+                "size": size,
+                "mtime": mtime,
+                "model": model,
+            }
+        )
+        return model
@@ -1,27 +1,107 @@
+from __future__ import annotations
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+import hashlib
+import json
+import os
 from pathlib import Path
-from shutil import copytree, rmtree
+import sys
+from shutil import rmtree
+from typing import Iterable, Iterator
 
-from phml import PHML, AST, query_all, inspect
+from phml import PHML, AST, inspect
 from markdown2 import Markdown # https://github.com/trentm/python-markdown2
 
+from padi import __version__, profiling
+from padi.atomic import replacing
 from padi.nodes import *
+from padi.nodes.docstrings import docstrings
+from padi.profiling import span
+from .archive import Archive, is_archive
+from .compress import Precompressor
+from .manifest import Manifest, digest_files
+from .references import References, page_url, prefix_url
+from .search import SearchIndex, _docstring
 
 phml = PHML()
 
-def _get_components(user_templates: str = ""):
-    """Extract user components from the user defined path of custom components"""
+_render_state: dict = {}
+"""State of a render worker process in a parallel build."""
+
+_loaded_components: dict = {"key": ""}
+"""Key of the component files currently loaded into `phml`."""
+
+_precompressor: Precompressor | None = None
+"""Writes a `.gz` sibling of every written file while a build is precompressing."""
+
+_archive: Archive | None = None
+"""Archive every file of the output is written into while building into an archive."""
+
+RENDER_AHEAD = 4
+"""Number of pages each render worker may have finished but not yet written. Bounds the rendered
+pages held in memory during a parallel build.
+"""
+
+@contextmanager
+def _restore_sys_path():
+    """phml appends its scopes to `sys.path` on every compile and render. Restore the path
+    afterwards so it doesn't grow with every page that is built.
+    """
+
+    saved = list(sys.path)
+    try:
+        yield
+    finally:
+        sys.path[:] = saved
+
+class Template:
+    """A page layout that is parsed once and then compiled for every page."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.digest = digest_files(path)
+        self.ast = phml.load(path).ast
+
+    def compile(self, **context) -> AST:
+        # Compiling copies the ast so the parsed layout is never modified
+        phml.ast = self.ast
+        return phml.compile(**context)
+
+_templates: dict[Path, Template] = {}
+"""Parsed layouts by path. Replaced when the content hash of the layout changes."""
+
+def _load_template(path: Path) -> Template:
+    """Get the parsed layout at the path. It is only parsed again if the file changed."""
+
+    template = _templates.get(path)
+    if template is None or template.digest != digest_files(path):
+        template = _templates[path] = Template(path)
+    return template
+
+def _get_components(user_templates: str = "") -> list[Path]:
+    """Extract user components from the user defined path of custom components. Returns the paths
+    of all the loaded components. The components are only parsed again if any of them changed.
+    """
     
     path = Path(__file__).parent.joinpath("components")
-    phml.add(list(path.glob("**/*.phml")), strip=path.as_posix())
+    components = sorted(path.glob("**/*.phml"))
+    user_path = Path(user_templates).joinpath("components")
+    user_components = sorted(user_path.glob("**/*.phml")) if user_templates != "" else []
 
-    if user_templates != "":
-        path = Path(user_templates).joinpath("components")
-        phml.add(list(path.glob("**/*.phml")), strip=path.as_posix())
+    key = digest_files(*components, *user_components)
+    if _loaded_components["key"] != key:
+        phml.add(components, strip=path.as_posix())
+        if len(user_components) > 0:
+            phml.add(user_components, strip=user_path.as_posix())
+        _loaded_components["key"] = key
 
-def _build_file(module: Module, file: File, root: Path, name: str, version: str):
+    return [*components, *user_components]
+
+def _build_file(module: Module, file: File, template: Template, name: str, version: str):
     """Build a specific python files documentation page."""
 
-    return phml.load(root).compile(
+    return template.compile(
         project=name,
         version=version,
         file=file,
@@ -29,69 +109,599 @@ def _build_file(module: Module, file: File, root: Path, name: str, version: str)
         code_highlight=code_highlight
     )
     
-def code_highlight(code: str) -> str:
-    """Exposed method to templates to allow for python code strings to be highlighted with markdown
-    and pygmentize.
-    """
-    md = Markdown(extras=["fenced-code-blocks"])
-    
-    return md.convert(f'''\
+_highlighter = Markdown(extras=["fenced-code-blocks"])
+"""Markdown converter shared by every highlight."""
+
+HIGHLIGHT_CACHE_SIZE = 4096
+"""Max number of highlighted code strings that are remembered."""
+
+_highlights: OrderedDict[str, str] = OrderedDict()
+"""Least recently used cache of highlighted code keyed by the code."""
+
+_HIGHLIGHT_BLOCK = '<div class="codehilite">'
+
+def _fence(code: str) -> str:
+    return f'''\
 ```python
 {code}
 ```\
-''')
+'''
+
+def _remember_highlight(code: str, html: str):
+    _highlights[code] = html
+    _highlights.move_to_end(code)
+    if len(_highlights) > HIGHLIGHT_CACHE_SIZE:
+        _highlights.popitem(last=False)
+
+def code_highlight(code: str) -> str:
+    """Exposed method to templates to allow for python code strings to be highlighted with markdown
+    and pygmentize. Results are cached so repeated code is only highlighted once.
+    """
+
+    html = _highlights.get(code)
+    if html is None:
+        html = _highlighter.convert(_fence(code))
+    _remember_highlight(code, html)
+    return html
+
+def highlight_all(codes: Iterable[str]) -> list[str]:
+    """Highlight many python code strings at once. All code that isn't cached yet is highlighted
+    with a single markdown conversion and the results are added to the cache.
+    """
+
+    codes = list(codes)
+    missing = list(dict.fromkeys(
+        code for code in codes if code not in _highlights and "```" not in code
+    ))
+
+    if len(missing) > 1:
+        blocks = _highlighter.convert("\n\n".join(_fence(code) for code in missing))
+        blocks = blocks.split(_HIGHLIGHT_BLOCK)[1:]
+        if len(blocks) == len(missing):
+            for code, block in zip(missing, blocks):
+                _remember_highlight(code, _HIGHLIGHT_BLOCK + block.rstrip("\n") + "\n")
+
+    return [code_highlight(code) for code in codes]
+
+def highlight_file(file: File) -> list[str]:
+    """Highlight the signatures of all the objects in a file in one batch."""
+    return highlight_all(obj.code for obj in file.objects)
     
-def _fix_urls(ast: AST, root: str):
+URL_ATTRIBUTES = ("href", "src")
+"""Attributes holding urls that are prefixed with the website root."""
+
+ASSETS_URL = "/assets/"
+"""Urls of the static assets. They are prefixed with the assets root instead of the website root."""
+
+FINGERPRINT_LENGTH = 8
+"""Number of hex digits of the content hash that are added to the name of every asset."""
+
+def _url_root(root: str) -> str:
+    """Normalize the website root to a single leading `/` and no trailing `/`. An empty root stays
+    empty which means urls are left as is.
+    """
+
+    if root == "":
+        return ""
+    return "/" + root.replace('\\', '/').strip('/')
+
+def _fix_urls(
+    ast: AST,
+    root: str,
+    assets_root: str | None = None,
+    asset_urls: dict[str, str] | None = None,
+):
     """Any url prefixed with `/` and doesn't start with the website root will
     automatically have the website root prefixed to it. This is applies for all
-    elements with `src` or `href` attributes.
+    elements with `src` or `href` attributes. Urls of assets are first replaced with their
+    fingerprinted url from `asset_urls` and prefixed with `assets_root` instead, which defaults to
+    the website root.
+
+    Both roots must already be normalized with `_url_root`. The tree is walked once and both
+    attributes are checked on every element.
     """
 
-    if root != "":
-        root = "/" + root.replace('\\', '/').strip('/')
-        for link_type in ["href", "src"]:
-            for node in query_all(ast, f"[{link_type}^=/]"):
-                if not node[link_type].startswith(root):
-                    node[link_type] = "/" + root.strip("/") + "/" + node[link_type].lstrip("/")
+    if assets_root is None:
+        assets_root = root
+    asset_urls = asset_urls or {}
+    if root == "" and assets_root == "" and len(asset_urls) == 0:
+        return ast
+
+    stack = [ast.tree]
+    while len(stack) > 0:
+        node = stack.pop()
+        if node.type == "element":
+            properties = node.properties
+            for attribute in URL_ATTRIBUTES:
+                url = properties.get(attribute)
+                if not isinstance(url, str) or not url.startswith("/"):
+                    continue
+                if url.startswith(ASSETS_URL):
+                    properties[attribute] = prefix_url(asset_urls.get(url, url), assets_root)
+                else:
+                    properties[attribute] = prefix_url(url, root)
+        children = getattr(node, "children", None)
+        if children:
+            stack.extend(children)
     return ast
-    
-def _build_modules(
-    root: Module,
+
+def _pages(root: Module) -> Iterator[tuple[Module, File]]:
+    """All the pages of a module and its sub modules in build order. Each page is the module it
+    belongs to and the file it documents.
+    """
+
+    yield root, root["__init__.py"]
+    for file in root.files():
+        if file.file_name != "__init__.py":
+            yield root, file
+
+    for module in root.sub_modules():
+        yield from _pages(module)
+
+def _page_path(file: File) -> str:
+    """Path of a files page relative to the output directory."""
+    return Path(page_url(file).lstrip("/")).joinpath("index.html").as_posix()
+
+def _page_key(
+    module: Module,
+    file: File,
+    build_key: str,
+    references: References | None = None
+) -> str:
+    """Key of everything a page is rendered from. This includes the file itself, the
+    surrounding files and modules that are linked to in the nav, and what the references in its
+    docstrings resolved to.
+    """
+
+    parent = file.parent
+    grandparent = parent.parent if parent is not None else None
+    return digest_files(
+        extra=[
+            build_key,
+            file.digest,
+            file.file_name,
+            file.url,
+            [parent.name, parent.url] if parent is not None else None,
+            [grandparent.name, grandparent.url] if grandparent is not None else None,
+            [[sub_file.file_name, sub_file.url] for sub_file in module.files()],
+            [[sub_module.name, sub_module.url] for sub_module in module.sub_modules()],
+            references.file_links(file) if references is not None else [],
+        ]
+    )
+
+def _render_page(
+    module: Module,
+    file: File,
     name: str,
     version: str,
+    template: Template,
+    website_root: str = "",
+    assets_root: str | None = None,
+    asset_urls: dict[str, str] | None = None,
+    prefix: str = "",
+) -> str:
+    """Render a single page to html. `website_root` and `assets_root` are the roots normalized
+    with `_url_root` and `asset_urls` maps assets to their fingerprinted urls. The page is
+    profiled as its path prefixed with `prefix`.
+    """
+
+    # phml caches the locals of a component's python block from its first use. Clear them so
+    # every page is rendered from its own context no matter which pages were rendered before it.
+    for component in phml.components.values():
+        if isinstance(component, dict) and "cache" in component:
+            component["cache"] = None
+
+    page = prefix + _page_path(file)
+    with span("highlight", "page", page=page):
+        highlight_file(file)
+    with _restore_sys_path():
+        with span("compile", "page", page=page):
+            ast = _build_file(module, file, template, name, version)
+        with span("fix_urls", "page", page=page):
+            phml.ast = _fix_urls(ast, website_root, assets_root, asset_urls)
+        try:
+            with span("render", "page", page=page):
+                return phml.render()
+        finally:
+            # Release the page now instead of holding it until the next page replaces it
+            phml.ast = None
+
+def _write_file(path: Path, data: bytes):
+    """Write a file of the output, or add it to the archive when building into one."""
+
+    if _archive is not None:
+        _archive.write(path, data)
+        return
+
+    with replacing(path) as temp:
+        with open(temp, "wb") as file:
+            file.write(data)
+
+def _compress(path: Path, data: bytes):
+    """Keep the `.gz` sibling of a file that was just written in step with it. It is compressed
+    again while precompressing and removed otherwise, so a server never serves an old copy.
+    """
+
+    if _precompressor is not None:
+        _precompressor.add(path, data)
+    elif _archive is None:
+        path.with_name(path.name + ".gz").unlink(missing_ok=True)
+
+def _write_page(path: Path, content: str, page: str):
+    data = content.encode("utf-8")
+    with span("write", "page", page=page):
+        _write_file(path, data)
+    _compress(path, data)
+
+def _save_manifest(manifest: Manifest):
+    if _archive is not None:
+        _write_file(manifest.path, manifest.dumps().encode("utf-8"))
+    else:
+        manifest.save()
+
+@contextmanager
+def _archiving(out: Path) -> Iterator[None]:
+    """Write the output into an archive at `out` while in the context if it is an archive path.
+    The archive only replaces `out` if the build succeeds.
+    """
+
+    global _archive
+    if not is_archive(out):
+        yield
+        return
+
+    _archive = Archive(out)
+    try:
+        yield
+    except BaseException:
+        _archive.abort()
+        raise
+    else:
+        _archive.close()
+    finally:
+        _archive = None
+
+@contextmanager
+def _precompressing(enabled: bool, out: Path, jobs: int) -> Iterator[None]:
+    """Precompress every file written to the output while in the context. Files that weren't
+    written again are compressed at the end if their `.gz` file is out of date. The savings are
+    reported on stderr.
+    """
+
+    global _precompressor
+    if not enabled:
+        yield
+        return
+
+    _precompressor = Precompressor(_write_file, jobs)
+    try:
+        yield
+        with span("precompress"):
+            if out.is_dir():
+                _precompressor.sweep(out)
+            else:
+                _precompressor.wait()
+        print(_precompressor.summary(), file=sys.stderr)
+    finally:
+        _precompressor.close()
+        _precompressor = None
+
+def _remove_page(out: Path, page: str):
+    """Remove a page along with its compressed copy and any directories that are left empty
+    because of it. Entries ending in `/` are the directories of packages and are removed whole.
+    """
+
+    path = out.joinpath(page)
+    if page.endswith("/"):
+        rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+        path.with_name(path.name + ".gz").unlink(missing_ok=True)
+    for parent in path.parents:
+        if parent == out or not parent.is_relative_to(out):
+            break
+        try:
+            parent.rmdir()
+        except OSError:
+            break
+
+def _fingerprinted(name: str, digest: str) -> str:
+    """The name of an asset with its content hash before the suffix."""
+
+    path = Path(name)
+    return path.with_name(f"{path.stem}.{digest[:FINGERPRINT_LENGTH]}{path.suffix}").as_posix()
+
+def _copy_assets(sources: list[Path], dest: Path) -> dict[str, str]:
+    """Copy the static assets with the content hash in their names, for example `global.css` is
+    copied as `global.3f9a1c2b.css`, so they can be cached forever. Assets in later sources
+    replace the ones with the same path in earlier sources.
+
+    An asset is only copied if a file with its hash isn't already in `dest`. Assets of previous
+    builds that are no longer used are removed. Returns the url of every asset mapped to its
+    fingerprinted url.
+    """
+
+    assets: dict[str, Path] = {}
+    for src in sources:
+        if src.is_dir():
+            for asset in sorted(src.glob("**/*")):
+                if asset.is_file():
+                    assets[asset.relative_to(src).as_posix()] = asset
+
+    manifest = Manifest(dest)
+    urls = {}
+    for name, asset in sorted(assets.items()):
+        data = asset.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        target = _fingerprinted(name, digest)
+        if manifest.changed(target, digest):
+            _write_file(dest.joinpath(target), data)
+            _compress(dest.joinpath(target), data)
+        urls[ASSETS_URL + name] = ASSETS_URL + target
+
+    for stale in manifest.stale():
+        _remove_page(dest, stale)
+    _save_manifest(manifest)
+    return urls
+
+def _asset_sources(user_templates: str) -> list[Path]:
+    """padi's assets followed by the assets of the users layouts, which replace padi's."""
+
+    sources = [Path(__file__).parent.joinpath("assets")]
+    if user_templates != "":
+        sources.append(Path(user_templates).joinpath("assets"))
+    return sources
+
+def _write_search(out: Path, index: SearchIndex):
+    """Write the search index to `search/` in the output. Only files whose content changed since
+    the last build are written and files that are no longer part of the index are removed.
+    """
+
+    search = out.joinpath("search")
+    previous = {}
+    try:
+        with open(search.joinpath("index.json"), "r", encoding="utf-8") as file:
+            previous = json.load(file).get("files", {})
+    except (OSError, ValueError):
+        pass
+
+    files = index.files()
+    current = json.loads(files["index.json"])["files"]
+    for path, content in files.items():
+        target = search.joinpath(path)
+        if path == "index.json":
+            changed = previous != current
+        else:
+            changed = previous.get(path) != current[path]
+        if changed or not target.is_file():
+            # Not a page, so it is profiled apart from the pages
+            data = content.encode("utf-8")
+            with span("write", "search", file=target.as_posix()):
+                _write_file(target, data)
+            _compress(target, data)
+
+    for path in previous:
+        if path not in current:
+            _remove_page(search, path)
+
+class _Build:
+    """The pages of one module and the output directory they are written to.
+
+    Creating a build resolves the references of the module, writes its search index, and selects
+    the pages whose inputs changed since the last build recorded in the manifest of `out`. Pages
+    are profiled as their path prefixed with `prefix`, which tells apart the pages of packages
+    that are built together.
+    """
+
+    def __init__(
+        self,
+        module: Module,
+        project: str,
+        version: str,
+        out: Path,
+        template: Path,
+        components: list[Path],
+        *,
+        website_root: str = "",
+        assets_root: str | None = None,
+        asset_urls: dict[str, str] | None = None,
+        prefix: str = "",
+    ) -> None:
+        self.root = module
+        self.project = project
+        self.version = version
+        self.out = out
+        self.website_root = website_root
+        self.assets_root = website_root if assets_root is None else assets_root
+        self.asset_urls = asset_urls or {}
+        self.prefix = prefix
+
+        with span("references"):
+            self.references = References(module)
+            self.references.resolve_tree()
+
+        with span("search"):
+            _write_search(out, SearchIndex(module, website_root))
+
+        self.manifest = Manifest(out)
+        build_key = digest_files(
+            template,
+            *components,
+            extra=[
+                __version__,
+                project,
+                version,
+                website_root,
+                self.assets_root,
+                sorted(self.asset_urls.items()),
+            ],
+        )
+        self.pages = list(_pages(module))
+        self.selected = [
+            index
+            for index, (module, file) in enumerate(self.pages)
+            if self.manifest.changed(
+                _page_path(file),
+                _page_key(module, file, build_key, self.references)
+            )
+        ]
+
+    def worker_args(self) -> tuple:
+        """What a render worker needs to render the pages of the build."""
+        return (
+            self.root,
+            self.project,
+            self.version,
+            self.website_root,
+            self.assets_root,
+            self.asset_urls,
+            self.prefix,
+        )
+
+    def finish(self):
+        """Remove the pages that are no longer part of the build and save the manifest."""
+
+        for page in self.manifest.stale():
+            _remove_page(self.out, page)
+        _save_manifest(self.manifest)
+
+        if self.references.summary() != "":
+            print(self.references.summary(), file=sys.stderr)
+
+def _init_render_worker(
+    builds: list[tuple],
+    template: Path,
+    user_templates: str,
+    docstring_cache: Path | None,
+    low_memory: bool,
+    profile: bool,
+):
+    """Set up a render worker process with its own loaded components and the pages of every
+    build it renders.
+    """
+
+    if profile:
+        profiling.start()
+    _get_components(user_templates)
+    if docstring_cache is not None:
+        docstrings.load(docstring_cache)
+    _render_state.update(
+        builds=[(list(_pages(root)), *args) for root, *args in builds],
+        template=_load_template(template),
+        low_memory=low_memory,
+    )
+
+def _render_worker_page(build: int, index: int) -> tuple[str, dict[str, str], list[dict]]:
+    """Render the page at the given index of a build inside of a render worker process. Returns
+    the page, the docstrings the worker rendered for the first time so they can be cached by the
+    main process, and the profiled events of the page if profiling is on.
+    """
+
+    (
+        pages,
+        name,
+        version,
+        website_root,
+        assets_root,
+        asset_urls,
+        prefix,
+    ) = _render_state["builds"][build]
+    module, file = pages[index]
+    page = _render_page(
+        module,
+        file,
+        name,
+        version,
+        _render_state["template"],
+        website_root,
+        assets_root,
+        asset_urls,
+        prefix,
+    )
+    if _render_state["low_memory"]:
+        file.compact()
+    added = dict(docstrings.added)
+    docstrings.added.clear()
+    profiler = profiling.active()
+    return page, added, profiler.drain() if profiler is not None else []
+
+def _build_modules(
+    builds: list[_Build],
     template: Path,
-    out: Path,
     *,
-    website_root: str = ""
+    user_templates: str = "",
+    jobs: int = 1,
+    low_memory: bool = False,
 ):
-    """Build the files and modules inside of a given module."""
-
-    out.joinpath(root["__init__.py"].url.lstrip("/")).mkdir(parents=True, exist_ok=True)
-    # Write the home page
-    with open(out.joinpath(root["__init__.py"].url.lstrip("/"), "index.html"), "+w", encoding="utf-8") as file:
-        phml.ast = _fix_urls(
-            _build_file(root, root["__init__.py"], template, name, version),
-            website_root
-        )
-        file.write(phml.render())
-    
-    for file in root.files():
-        if file.file_name != "__init__.py":
-            phml.ast = _fix_urls(
-                _build_file(root, root[file.file_name], template, name, version),
-                website_root
+    """Render the selected pages of every build. With more than one job the pages of all the
+    builds are rendered across one pool of worker processes and written in the same order as a
+    serial build. Workers only render a few pages ahead of the writer so finished pages don't pile
+    up in memory. With `low_memory` each file is compacted once its page is written.
+    """
+
+    selected = [(build, index) for build in builds for index in build.selected]
+
+    if jobs > 1 and len(selected) > 1:
+        jobs = min(jobs, len(selected))
+        numbers = {id(build): number for number, build in enumerate(builds)}
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_render_worker,
+            initargs=(
+                [build.worker_args() for build in builds],
+                template,
+                user_templates,
+                docstrings.path,
+                low_memory,
+                profiling.active() is not None,
+            ),
+        ) as pool:
+            pending: deque[tuple[_Build, int, Future[tuple[str, dict[str, str], list[dict]]]]]
+            pending = deque()
+
+            def write_next():
+                build, index, future = pending.popleft()
+                content, added, events = future.result()
+                docstrings.merge(added)
+                profiler = profiling.active()
+                if len(events) > 0 and profiler is not None:
+                    profiler.extend(events)
+                page = _page_path(build.pages[index][1])
+                _write_page(build.out.joinpath(page), content, build.prefix + page)
+
+            for build, index in selected:
+                future = pool.submit(_render_worker_page, numbers[id(build)], index)
+                pending.append((build, index, future))
+                if len(pending) >= jobs * RENDER_AHEAD:
+                    write_next()
+            while len(pending) > 0:
+                write_next()
+    elif len(selected) > 0:
+        layout = _load_template(template)
+        for build, index in selected:
+            module, file = build.pages[index]
+            page = _page_path(file)
+            content = _render_page(
+                module,
+                file,
+                build.project,
+                build.version,
+                layout,
+                build.website_root,
+                build.assets_root,
+                build.asset_urls,
+                build.prefix,
             )
-            file_dir = out.joinpath(file.url.lstrip("/"))
-            file_dir.mkdir(parents=True, exist_ok=True)
-            with open(
-                file_dir.joinpath("index.html"), 
-                "+w", 
-                encoding="utf-8"
-            ) as out_file:
-                out_file.write(phml.render())
-    
-    for module in root.sub_modules():
-        _build_modules(module, name, version, template, out, website_root=website_root)
+            _write_page(build.out.joinpath(page), content, build.prefix + page)
+            if low_memory:
+                file.compact()
+
+def _layout(user_templates: str, name: str) -> Path:
+    """The users layout with the given file name if there is one, otherwise padi's own."""
+
+    if Path(user_templates).joinpath(name).is_file():
+        return Path(user_templates).joinpath(name)
+    return Path(__file__).parent.joinpath(name)
 
 def build_docs(
     module: Module,
@@ -100,28 +710,238 @@ def build_docs(
     *,
     out: str = "docs/",
     root: str = "",
-    user_templates: str = ""
+    user_templates: str = "",
+    incremental: bool = False,
+    jobs: int = 1,
+    cache_dir: str = "",
+    low_memory: bool = False,
+    precompress: bool = False,
 ) -> str:
-    """Build the documentation of the module."""
-    
-    rmtree(out, ignore_errors=True)
+    """Build the documentation of the module.
+
+    `[[dotted.path]]` references in docstrings are replaced with links to the page of the module,
+    file, or symbol they point to. References that can't be resolved are reported on stderr.
+
+    With `incremental` the previous output is kept and only pages whose source, template, or
+    navigation changed are rendered again. Pages that no longer exist are removed.
+
+    `jobs` is the number of processes used to render pages. `0` uses one per cpu.
+
+    If `cache_dir` is given, the html of rendered docstrings is stored there and reused by later
+    builds for any docstring that hasn't changed.
+
+    With `low_memory` the lists each file derives from its objects are dropped once its page is
+    rendered instead of being kept for the whole build.
+
+    With `precompress` a gzip compressed `.gz` copy of every page, asset, and search file is
+    written next to it on a pool of `jobs` threads while the pages are rendered. Files that didn't
+    change keep their `.gz` copy.
+
+    If `out` ends in `.zip`, `.tar`, `.tar.gz`, or `.tgz` every file is streamed into an archive
+    at that path as it is written instead of into a directory. Archives are always built in full.
+    """
+
+    if jobs < 1:
+        jobs = os.cpu_count() or 1
+
+    if not incremental and not is_archive(out):
+        rmtree(out, ignore_errors=True)
     
-    _get_components(user_templates)
+    with span("components"):
+        components = _get_components(user_templates)
+    template = _layout(user_templates, "module.phml")
+
+    out_dir = Path(out)
+    if not is_archive(out_dir):
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+    with _archiving(out_dir), _precompressing(precompress, out_dir, jobs):
+        with span("assets"):
+            asset_urls = _copy_assets(_asset_sources(user_templates), out_dir.joinpath("assets"))
+
+        if cache_dir != "":
+            docstrings.load(Path(cache_dir).joinpath("docstrings.pickle"))
+
+        build = _Build(
+            module,
+            project,
+            version,
+            out_dir,
+            template,
+            components,
+            website_root=_url_root(root),
+            asset_urls=asset_urls,
+        )
 
-    template = Path(__file__).parent.joinpath("module.phml")
-    if Path(user_templates).joinpath("module.phml").is_file():
-        template = Path(user_templates).joinpath("module.phml")
+        # iterate through other files/modules and create their pages
+        with span("pages"):
+            _build_modules(
+                [build],
+                template,
+                user_templates=user_templates,
+                jobs=jobs,
+                low_memory=low_memory,
+            )
+
+        with span("cleanup"):
+            build.finish()
+            docstrings.save()
+
+
+class Package:
+    """A package of a multi package build. Its docs are written to a directory of its own name
+    below the output directory.
+    """
+
+    def __init__(self, module: Module, name: str = "", version: str = "1") -> None:
+        self.module = module
+        self.name = name or Path(module.name).name
+        self.version = version
+
+    @property
+    def url(self) -> str:
+        return f"/{self.name}/"
+
+    @property
+    def summary(self) -> str:
+        """First line of the docstring of the packages `__init__.py`."""
+
+        if "__init__.py" not in self.module:
+            return ""
+        return _docstring(self.module["__init__.py"]).strip().split("\n", 1)[0]
+
+def duplicate_names(packages: list[Package]) -> list[str]:
+    """Names used by more than one of the packages. Every package needs its own directory."""
+
+    names = [package.name for package in packages]
+    return sorted({name for name in names if names.count(name) > 1})
+
+def _write_index(
+    packages: list[Package],
+    title: str,
+    out: Path,
+    template: Path,
+    components: list[Path],
+    website_root: str,
+    asset_urls: dict[str, str],
+):
+    """Write the page linking to every package. It is only rendered again if a package, the
+    layout, the components, or the assets changed.
+
+    The packages are recorded in the manifest of `out` as well, so the directories of packages
+    that were part of the previous build but no longer are get removed.
+    """
+
+    listed = [[package.name, package.version, package.summary] for package in packages]
+    manifest = Manifest(out)
+    for package in packages:
+        manifest.changed(f"{package.name}/", package.name)
+    key = digest_files(
+        template,
+        *components,
+        extra=[__version__, title, listed, website_root, sorted(asset_urls.items())],
+    )
+    if manifest.changed("index.html", key):
+        layout = _load_template(template)
+        with _restore_sys_path():
+            ast = layout.compile(title=title, packages=packages)
+            phml.ast = _fix_urls(ast, website_root, website_root, asset_urls)
+            try:
+                content = phml.render()
+            finally:
+                phml.ast = None
+        _write_page(out.joinpath("index.html"), content, "index.html")
+
+    for stale in manifest.stale():
+        _remove_page(out, stale)
+    _save_manifest(manifest)
+
+def build_packages(
+    packages: list[Package],
+    title: str = "",
+    *,
+    out: str = "docs/",
+    root: str = "",
+    user_templates: str = "",
+    incremental: bool = False,
+    jobs: int = 1,
+    cache_dir: str = "",
+    low_memory: bool = False,
+    precompress: bool = False,
+):
+    """Build the documentation of many packages in one go along with an index page linking to
+    each of them.
+
+    Every package is built the same as with `build_docs` into `out/<name>/` with the website root
+    `root/<name>`. The packages share the loaded components, parsed layouts, highlight and
+    docstring caches, and a single copy of the assets in `out/assets/`. The pages of all the
+    packages are rendered by one pool of `jobs` processes so packages are built concurrently.
+    `precompress` works the same as with `build_docs`.
+    """
+
+    if jobs < 1:
+        jobs = os.cpu_count() or 1
+
+    duplicates = duplicate_names(packages)
+    if len(duplicates) > 0:
+        raise ValueError(f"Packages must have unique names: {', '.join(duplicates)}")
+
+    if not incremental and not is_archive(out):
+        rmtree(out, ignore_errors=True)
+
+    with span("components"):
+        components = _get_components(user_templates)
+    template = _layout(user_templates, "module.phml")
 
     out_dir = Path(out)
-    out_dir.mkdir(parents=True, exist_ok=True)
-    try:
-        copytree(Path(__file__).parent.joinpath("assets"), Path(out).joinpath("assets"), dirs_exist_ok=True)
-    except: pass
+    if not is_archive(out_dir):
+        out_dir.mkdir(parents=True, exist_ok=True)
 
-    # Write the home page
-    # with open(out_dir.joinpath("index.html"), "+w", encoding="utf-8") as file:
-    #     file.write(build_module(module, module["__init__.py"], root, project, version))
+    with _archiving(out_dir), _precompressing(precompress, out_dir, jobs):
+        with span("assets"):
+            asset_urls = _copy_assets(_asset_sources(user_templates), out_dir.joinpath("assets"))
+
+        if cache_dir != "":
+            docstrings.load(Path(cache_dir).joinpath("docstrings.pickle"))
+
+        website_root = _url_root(root)
+        builds = []
+        for package in packages:
+            with span("package", package=package.name):
+                builds.append(_Build(
+                    package.module,
+                    package.name,
+                    package.version,
+                    out_dir.joinpath(package.name),
+                    template,
+                    components,
+                    website_root=f"{website_root}/{package.name}",
+                    assets_root=website_root,
+                    asset_urls=asset_urls,
+                    prefix=f"{package.name}/",
+                ))
+
+        with span("pages"):
+            _build_modules(
+                builds,
+                template,
+                user_templates=user_templates,
+                jobs=jobs,
+                low_memory=low_memory,
+            )
+
+        with span("index"):
+            _write_index(
+                packages,
+                title,
+                out_dir,
+                _layout(user_templates, "packages.phml"),
+                components,
+                website_root,
+                asset_urls,
+            )
 
-    # iterate through other files/modules and create their pages
-    _build_modules(module, project, version, template, out_dir, website_root=root)
-    
\ No newline at end of file
+        with span("cleanup"):
+            for build in builds:
+                build.finish()
+            docstrings.save()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+import io
+import os
+from pathlib import Path
+import tarfile
+import threading
+import time
+import zipfile
+
+__all__ = [
+    "ARCHIVE_SUFFIXES",
+    "Archive",
+    "is_archive",
+]
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")
+"""Output paths ending in one of these are written as an archive instead of a directory."""
+
+MTIME = 315532800
+"""Modification time of every archived file, 1980-01-01 which is the earliest a zip can store.
+Fixed so building the same docs the same way always gives the same archive.
+"""
+
+def is_archive(path: str | Path) -> bool:
+    return str(path).lower().endswith(ARCHIVE_SUFFIXES)
+
+class Archive:
+    """A zip or tar archive that the output is written into instead of a directory.
+
+    Files are added as soon as they are written so no directory tree is ever created. The archive
+    is written to a temp file next to `path` and only replaces `path` once it is closed, so a
+    failed build never leaves a partial archive behind. Extracting the archive gives the same
+    tree as writing the output to a directory.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        self.lock = threading.Lock()
+        self.names: set[str] = set()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        name = path.name.lower()
+        self.zip: zipfile.ZipFile | None
+        self.tar: tarfile.TarFile | None
+        if name.endswith(".zip"):
+            self.zip = zipfile.ZipFile(self.temp, "w", zipfile.ZIP_DEFLATED)
+            self.tar = None
+        else:
+            gzipped = name.endswith((".tar.gz", ".tgz"))
+            self.zip = None
+            self.tar = tarfile.open(self.temp, "w:gz" if gzipped else "w")
+
+    def write(self, path: Path, data: bytes):
+        """Add a file of the output. `path` is where the file would be written if the output was
+        a directory at `self.path`. Safe to call from many threads.
+        """
+
+        name = path.relative_to(self.path).as_posix()
+        with self.lock:
+            if name in self.names:
+                raise ValueError(f"{name!r} was already written to {self.path}")
+            self.names.add(name)
+
+            if self.zip is not None:
+                info = zipfile.ZipInfo(name, time.gmtime(MTIME)[:6])
+                info.external_attr = 0o644 << 16
+                # Compressed files gain nothing from being deflated again
+                if name.endswith(".gz"):
+                    info.compress_type = zipfile.ZIP_STORED
+                else:
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                self.zip.writestr(info, data)
+            elif self.tar is not None:
+                member = tarfile.TarInfo(name)
+                member.size = len(data)
+                member.mode = 0o644
+                member.mtime = MTIME
+                self.tar.addfile(member, io.BytesIO(data))
+
+    def close(self):
+        """Finish the archive and move it to its path."""
+
+        self._close()
+        os.replace(self.temp, self.path)
+
+    def abort(self):
+        """Throw the archive away, leaving any previous archive at the path as is."""
+
+        self._close()
+        self.temp.unlink(missing_ok=True)
+
+    def _close(self):
+        if self.zip is not None:
+            self.zip.close()
+        if self.tar is not None:
+            self.tar.close()
@@ -0,0 +1,127 @@
+// Search the prebuilt index in `search/`. Only `index.json` and the shards a query needs are
+// loaded. Term shards are keyed by the prefix their terms start with. Postings are
+// `document id << 2 | field`, where a higher field is a better match, and each posting is stored
+// as the difference to the previous one.
+(() => {
+    // The index is linked from the page since the assets can be shared by many packages
+    const link = document.getElementById("search-index");
+    const base = link === null ? "/search/" : link.href.replace(/index\.json$/, "");
+    const LIMIT = 20;
+
+    const cache = {};
+    const load = (path) => {
+        if (!(path in cache)) {
+            cache[path] = fetch(base + path).then((response) => response.json());
+        }
+        return cache[path];
+    };
+
+    const terms = (query) => query
+        .toLowerCase()
+        .split(/[^a-z0-9_]+/)
+        .map((word) => word.replace(/^_+|_+$/g, ""))
+        .filter((word) => word.length >= 2);
+
+    async function search(query) {
+        const index = await load("index.json");
+        const words = terms(query);
+        if (words.length === 0) {
+            return [];
+        }
+
+        const prefixes = Object.keys(index.files)
+            .filter((path) => path.startsWith("terms/"))
+            .map((path) => path.slice("terms/".length, -".json".length));
+
+        let scores = null;
+        for (const word of words) {
+            const found = new Map();
+            const shards = prefixes.filter(
+                (prefix) => word.startsWith(prefix) || prefix.startsWith(word)
+            );
+            for (const prefix of shards) {
+                const postings = await load(`terms/${prefix}.json`);
+                for (const term in postings) {
+                    if (!term.startsWith(word)) {
+                        continue;
+                    }
+                    let posting = 0;
+                    for (const delta of postings[term]) {
+                        posting += delta;
+                        const doc = posting >> 2;
+                        const score = (posting & 3) + 1 + (term === word ? 4 : 0);
+                        found.set(doc, Math.max(found.get(doc) || 0, score));
+                    }
+                }
+            }
+
+            if (scores === null) {
+                scores = found;
+            } else {
+                for (const [doc, score] of scores) {
+                    if (found.has(doc)) {
+                        scores.set(doc, score + found.get(doc));
+                    } else {
+                        scores.delete(doc);
+                    }
+                }
+            }
+        }
+
+        const best = [...scores]
+            .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+            .slice(0, LIMIT);
+        return Promise.all(best.map(async ([doc]) => {
+            const docs = await load(`docs/${Math.floor(doc / index.docs_per_shard)}.json`);
+            const [path, href, kind, signature, summary] = docs[doc % index.docs_per_shard];
+            return { path, href, kind, signature, summary };
+        }));
+    }
+
+    function show(results, list) {
+        list.replaceChildren(...results.map((result) => {
+            const item = document.createElement("li");
+            const link = document.createElement("a");
+            link.href = result.href;
+
+            const path = document.createElement("code");
+            path.textContent = result.path;
+            const kind = document.createElement("span");
+            kind.className = "search-kind";
+            kind.textContent = result.kind;
+            const summary = document.createElement("small");
+            summary.textContent = result.summary || result.signature;
+
+            link.append(path, kind, summary);
+            item.append(link);
+            return item;
+        }));
+        list.hidden = results.length === 0;
+    }
+
+    document.addEventListener("DOMContentLoaded", () => {
+        const input = document.querySelector("#search input");
+        const list = document.querySelector("#search-results");
+        if (input === null || list === null) {
+            return;
+        }
+
+        let latest = 0;
+        let timer = null;
+        input.addEventListener("input", () => {
+            clearTimeout(timer);
+            timer = setTimeout(async () => {
+                const query = ++latest;
+                const results = await search(input.value);
+                if (query === latest) {
+                    show(results, list);
+                }
+            }, 100);
+        });
+        input.addEventListener("keydown", (event) => {
+            if (event.key === "Escape") {
+                list.hidden = true;
+            }
+        });
+    });
+})();
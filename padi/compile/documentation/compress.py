@@ -0,0 +1,123 @@
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import gzip
+from pathlib import Path
+from typing import Callable
+
+__all__ = [
+    "COMPRESSED_SUFFIXES",
+    "GZIP_LEVEL",
+    "MIN_SIZE",
+    "Precompressor",
+]
+
+COMPRESSED_SUFFIXES = {".html", ".css", ".js", ".json", ".svg", ".txt", ".xml", ".map"}
+"""Suffixes of the files that get a `.gz` sibling. Other files are usually compressed already."""
+
+GZIP_LEVEL = 9
+"""Compression level of the `.gz` files. They are written once and served many times."""
+
+MIN_SIZE = 256
+"""Files smaller than this many bytes are not worth compressing."""
+
+class Precompressor:
+    """Write a gzip compressed `.gz` sibling of output files for servers that serve them as is,
+    like nginx with `gzip_static`.
+
+    Files are compressed on a pool of threads so compression overlaps with rendering. zlib releases
+    the GIL while it compresses so the threads run in parallel with the rest of the build. The
+    compressed files are written with `write` from the calling thread, in the order they were
+    added, once more than `2 * workers` files are in flight. The output, for example the order of
+    the files in an archive, never depends on how fast the threads are.
+    """
+
+    def __init__(self, write: Callable[[Path, bytes], None], workers: int = 1) -> None:
+        self.write = write
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="gzip")
+        self.in_flight = 2 * max(1, workers)
+        self.pending: deque[Future] = deque()
+        self.files = 0
+        self.size = 0
+        self.compressed = 0
+
+    def add(self, path: Path, data: bytes):
+        """Compress the content that was just written to the path."""
+
+        if path.suffix in COMPRESSED_SUFFIXES:
+            self.pending.append(self.pool.submit(self._compress, path, data))
+        while len(self.pending) > self.in_flight:
+            self._write(self.pending.popleft().result())
+
+    def sweep(self, out: Path):
+        """Compress every file in the output whose `.gz` sibling is missing or older than the file.
+        Files written during the build are already compressed, so this only picks up files that
+        weren't written again, for example on the first precompressed build of existing output.
+        """
+
+        self.wait()
+        for path in sorted(out.glob("**/*")):
+            if (
+                path.suffix in COMPRESSED_SUFFIXES
+                and not path.name.startswith(".")
+                and path.is_file()
+                and not _up_to_date(path)
+            ):
+                self.pending.append(self.pool.submit(self._compress, path, None))
+        self.wait()
+
+    def wait(self):
+        """Write every file that is still being compressed."""
+
+        while len(self.pending) > 0:
+            self._write(self.pending.popleft().result())
+
+    def close(self):
+        self.wait()
+        self.pool.shutdown()
+
+    def _compress(self, path: Path, data: bytes | None) -> tuple[Path, int, bytes | None]:
+        """Compress a file in a worker thread. Returns the compressed file, the original size,
+        and the compressed content if it is worth writing.
+        """
+
+        if data is None:
+            data = path.read_bytes()
+
+        target = path.with_name(path.name + ".gz")
+        if len(data) < MIN_SIZE:
+            return target, len(data), None
+        compressed = gzip.compress(data, GZIP_LEVEL, mtime=0)
+        return target, len(data), compressed if len(compressed) < len(data) else None
+
+    def _write(self, result: tuple[Path, int, bytes | None]):
+        target, size, compressed = result
+        if compressed is None:
+            # Not worth serving compressed
+            if target.is_file():
+                target.unlink()
+            return
+
+        self.write(target, compressed)
+        self.files += 1
+        self.size += size
+        self.compressed += len(compressed)
+
+    def summary(self) -> str:
+        """Sizes of the files compressed by this build before and after compression."""
+
+        if self.files == 0:
+            return "Precompressed 0 files, every .gz file was up to date"
+
+        saved = self.size - self.compressed
+        return (
+            f"Precompressed {self.files} file(s): {self.size / 2**10:.1f} KiB -> "
+            f"{self.compressed / 2**10:.1f} KiB, saved {saved / 2**10:.1f} KiB "
+            f"({saved / self.size:.0%})"
+        )
+
+def _up_to_date(path: Path) -> bool:
+    try:
+        return path.with_name(path.name + ".gz").stat().st_mtime >= path.stat().st_mtime
+    except OSError:
+        return False
@@ -0,0 +1,67 @@
+from __future__ import annotations
+import hashlib
+import json
+from pathlib import Path
+
+from padi.atomic import replacing
+
+__all__ = [
+    "Manifest",
+    "digest_files"
+]
+
+def digest_files(*paths: Path, extra: list | None = None) -> str:
+    """Hash the content of the given files, in order, along with any extra json serializable data."""
+
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.as_posix().encode("utf-8"))
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    digest.update(json.dumps(extra or []).encode("utf-8"))
+    return digest.hexdigest()
+
+class Manifest:
+    """Record of the inputs every page in the output directory was last rendered from.
+
+    Pages are keyed by their path relative to the output directory. A page only needs to be
+    rendered again when the key of its inputs differs from the recorded one.
+    """
+
+    FILE_NAME = ".padi-manifest.json"
+
+    def __init__(self, out: Path) -> None:
+        self.out = out
+        self.previous: dict[str, str] = {}
+        self.pages: dict[str, str] = {}
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                self.previous = json.load(file).get("pages", {})
+        except (OSError, ValueError):
+            self.previous = {}
+
+    @property
+    def path(self) -> Path:
+        return self.out.joinpath(self.FILE_NAME)
+
+    def changed(self, page: str, key: str) -> bool:
+        """Record the key for a page and return whether it needs to be rendered again."""
+
+        self.pages[page] = key
+        return self.previous.get(page) != key or not self.out.joinpath(page).is_file()
+
+    def stale(self) -> list[str]:
+        """Pages from the previous build that are no longer part of this build."""
+        return sorted(page for page in self.previous if page not in self.pages)
+
+    def dumps(self) -> str:
+        return json.dumps({"pages": self.pages}, indent=2, sort_keys=True)
+
+    def save(self):
+        if self.pages == self.previous and self.path.is_file():
+            return
+
+        with replacing(self.path) as temp:
+            with open(temp, "w", encoding="utf-8") as file:
+                file.write(self.dumps())
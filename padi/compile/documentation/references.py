@@ -0,0 +1,142 @@
+from __future__ import annotations
+from collections import Counter
+import re
+
+from padi.nodes import AnnAssign, Class, File, Method, Module
+
+__all__ = [
+    "REFERENCE",
+    "References",
+    "page_url",
+    "prefix_url",
+]
+
+REFERENCE = re.compile(r"\[\[([A-Za-z_][\w.]*)\]\]")
+"""A `[[dotted.path]]` reference in a docstring."""
+
+def page_url(file: File) -> str:
+    """Url of the page a file is documented on with a single leading and trailing `/`. The
+    `File.url` of the top `__init__.py` is `//`, which browsers read as a protocol relative url.
+    """
+
+    path = file.url.strip("/")
+    return f"/{path}/" if path != "" else "/"
+
+def prefix_url(url: str, root: str) -> str:
+    """Prefix a url with the website root, normalized with `_url_root`, unless it already starts
+    with it. This is the rule `_fix_urls` applies to the links of every page.
+    """
+
+    if root != "" and not url.startswith(root):
+        return root + "/" + url.lstrip("/")
+    return url
+
+def _scope(name: str) -> str:
+    """Scope a top level object is rendered under. Used as the prefix of its anchor."""
+
+    if name.startswith("__"):
+        return "private"
+    if name.startswith("_"):
+        return "protected"
+    return "public"
+
+class References:
+    """Symbol table of everything in a module tree that a docstring can reference.
+
+    The table maps the dotted path of every module, file, and symbol to the href of the page and
+    anchor it is documented at. Symbols nested in a class link to the class.
+    """
+
+    def __init__(self, root: Module) -> None:
+        self.targets: dict[str, str] = {}
+        self.unresolved: Counter[str] = Counter()
+        self.links: dict[int, list[tuple[str, str | None]]] = {}
+        self.root = root
+
+        for file in root.all_files():
+            url = page_url(file)
+            if file.file_name == "__init__.py" and file.parent is not None:
+                self.targets[file.parent.dotted_path] = url
+            path = file.dotted_path
+            self.targets.setdefault(path, url)
+
+            for obj in file.objects:
+                href = f"{url}#{_scope(obj.name)}-{obj.name}"
+                self._add_symbol(f"{path}.{obj.name}", obj, href)
+
+    def _add_symbol(self, path: str, obj, href: str):
+        self.targets.setdefault(path, href)
+        if isinstance(obj, Class):
+            children: list[AnnAssign | Method | Class] = [
+                *obj.attributes,
+                *obj.methods,
+                *obj.classes,
+            ]
+            for child in children:
+                self._add_symbol(f"{path}.{child.name}", child, href)
+
+    def resolve(self, text: str, links: list | None = None) -> str:
+        """Replace every reference in the text with a markdown link to its target. References that
+        can't be resolved are left as is and counted in `unresolved`.
+        """
+
+        if "[[" not in text:
+            return text
+
+        def replace(match: re.Match) -> str:
+            path = match.group(1)
+            href = self.targets.get(path)
+            if links is not None:
+                links.append((path, href))
+            if href is None:
+                self.unresolved[path] += 1
+                return match.group(0)
+            return f"[`{path}`]({href})"
+
+        return REFERENCE.sub(replace, text)
+
+    def _resolve_docstring(self, obj, links: list):
+        # Keep the original docstring so the references can be resolved again if the tree changes
+        source = getattr(obj, "_source_docstring", None)
+        if source is None:
+            source = obj._docstring
+            obj._source_docstring = source
+        obj._docstring = self.resolve(source, links)
+
+    def resolve_tree(self):
+        """Resolve the references in every docstring of the tree. The links of each file are kept
+        in `links` keyed by the files id.
+        """
+
+        self.unresolved.clear()
+        self.links.clear()
+
+        def resolve_objects(objects: list, links: list):
+            for obj in objects:
+                self._resolve_docstring(obj, links)
+                if isinstance(obj, Class):
+                    resolve_objects([*obj.attributes, *obj.methods, *obj.classes], links)
+
+        for file in self.root.all_files():
+            links = []
+            self._resolve_docstring(file, links)
+            resolve_objects(file.objects, links)
+            self.links[id(file)] = links
+
+    def file_links(self, file: File) -> list[tuple[str, str | None]]:
+        """The references of a file and what they resolved to."""
+        return self.links.get(id(file), [])
+
+    def summary(self) -> str:
+        """Summary of the references that couldn't be resolved."""
+
+        if len(self.unresolved) == 0:
+            return ""
+
+        lines = [
+            f"{sum(self.unresolved.values())} unresolved reference(s) to "
+            f"{len(self.unresolved)} path(s):"
+        ]
+        for path, count in sorted(self.unresolved.items()):
+            lines.append(f"  [[{path}]] x{count}")
+        return "\n".join(lines)
@@ -0,0 +1,197 @@
+from __future__ import annotations
+from functools import lru_cache
+import hashlib
+import json
+import re
+from typing import Iterator
+
+from padi.nodes import AnnAssign, Class, File, Method, Module
+from .references import _scope, page_url, prefix_url
+
+__all__ = [
+    "DOCS_PER_SHARD",
+    "MAX_SHARD_POSTINGS",
+    "PREFIX_LENGTH",
+    "SIGNATURE_LENGTH",
+    "SearchIndex",
+    "terms",
+]
+
+PREFIX_LENGTH = 2
+"""Number of leading characters of a term that decide which shard it is in."""
+
+MAX_SHARD_POSTINGS = 20_000
+"""Shards with more postings than this are split by a prefix one character longer."""
+
+DOCS_PER_SHARD = 500
+"""Number of documents stored in each document shard."""
+
+SIGNATURE_LENGTH = 160
+"""Signatures longer than this are cut short in the documents."""
+
+NAME, PATH, SIGNATURE, DOCSTRING = 3, 2, 1, 0
+"""Fields a term can be found in. A posting keeps the most important field the term was found in
+for each document.
+"""
+
+_WORD = re.compile(r"[A-Za-z0-9_]+")
+_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+_STOP_WORDS = {
+    "and", "are", "for", "from", "has", "have", "into", "its", "not", "that", "the", "this",
+    "was", "will", "with", "you", "your",
+}
+
+@lru_cache(maxsize=2**16)
+def _word_terms(word: str, min_length: int) -> tuple[str, ...]:
+    found = []
+    whole = word.strip("_").lower()
+    if len(whole) >= min_length and whole not in _STOP_WORDS:
+        found.append(whole)
+    parts = _PART.findall(word)
+    if len(parts) > 1:
+        for part in parts:
+            part = part.lower()
+            if len(part) >= min_length and part not in _STOP_WORDS:
+                found.append(part)
+    return tuple(found)
+
+def terms(text: str, min_length: int = 2) -> Iterator[str]:
+    """Lower case search terms of a text. Every word is a term along with each of its snake_case
+    and camelCase parts.
+    """
+
+    for word in _WORD.findall(text):
+        yield from _word_terms(word, min_length)
+
+def _digest(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+class SearchIndex:
+    """Inverted index of every module, file, and symbol of a module tree.
+
+    Every documented target is a document of its dotted path, href, kind, signature, and the first
+    line of its docstring. Terms from the name, dotted path, signature, and docstring of a document
+    map to postings of `document id << 2 | field`. The index is built in one pass over the tree
+    and documents are numbered in that order, so postings are always sorted.
+
+    The index is written as shards of terms that share a prefix and shards of documents. Postings
+    are written as the difference to the previous posting to keep shards small. A browser only
+    loads `index.json` and then the shards a query needs.
+    """
+
+    def __init__(self, root: Module, website_root: str = "") -> None:
+        self.website_root = website_root
+        self.docs: list[list[str]] = []
+        self.postings: dict[str, list[int]] = {}
+
+        for file in root.all_files():
+            self._add_file(file)
+
+    def _add_doc(self, path: str, href: str, kind: str, signature: str, docstring: str):
+        docstring = docstring.replace("[[", "").replace("]]", "")
+        summary = docstring.strip().split("\n", 1)[0]
+        doc = len(self.docs)
+        self.docs.append([path, prefix_url(href, self.website_root), kind, signature, summary])
+
+        # Fields from the most to the least important so each term keeps the best field
+        fields: dict[str, int] = {}
+        for field, text, min_length in (
+            (NAME, path.rsplit(".", 1)[-1], 2),
+            (PATH, path, 2),
+            (SIGNATURE, signature, 2),
+            (DOCSTRING, docstring, 3),
+        ):
+            for term in terms(text, min_length):
+                fields.setdefault(term, field)
+
+        for term, field in fields.items():
+            self.postings.setdefault(term, []).append(doc << 2 | field)
+
+    def _add_file(self, file: File):
+        path = file.dotted_path
+        if file.file_name == "__init__.py" and file.parent is not None:
+            kind = "module"
+        else:
+            kind = "file"
+        url = page_url(file)
+        self._add_doc(path, url, kind, "", _docstring(file))
+
+        for obj in file.objects:
+            href = f"{url}#{_scope(obj.name)}-{obj.name}"
+            self._add_symbol(f"{path}.{obj.name}", obj, href)
+
+    def _add_symbol(self, path: str, obj, href: str):
+        signature = str(obj.code).split("\n")[-1]
+        if len(signature) > SIGNATURE_LENGTH:
+            signature = signature[:SIGNATURE_LENGTH - 3] + "..."
+        self._add_doc(path, href, obj.type, signature, _docstring(obj))
+        if isinstance(obj, Class):
+            children: list[AnnAssign | Method | Class] = [
+                *obj.attributes,
+                *obj.methods,
+                *obj.classes,
+            ]
+            for child in children:
+                self._add_symbol(f"{path}.{child.name}", child, href)
+
+    def shards(self) -> dict[str, dict[str, list[int]]]:
+        """The postings of every term grouped by the prefix of the term. Groups with more than
+        `MAX_SHARD_POSTINGS` postings are split by longer prefixes. A term that is the same as the
+        prefix of a split group is kept in a shard of its own.
+        """
+
+        groups: dict[str, list[str]] = {}
+        for term in sorted(self.postings):
+            groups.setdefault(term[:PREFIX_LENGTH], []).append(term)
+
+        shards: dict[str, dict[str, list[int]]] = {}
+        while len(groups) > 0:
+            prefix, group = groups.popitem()
+            size = sum(len(self.postings[term]) for term in group)
+            if size <= MAX_SHARD_POSTINGS or all(len(term) <= len(prefix) for term in group):
+                shards[prefix] = {term: self.postings[term] for term in group}
+                continue
+
+            for term in group:
+                key = term[:len(prefix) + 1]
+                if key == prefix:
+                    shards[prefix] = {term: self.postings[term]}
+                else:
+                    groups.setdefault(key, []).append(term)
+        return dict(sorted(shards.items()))
+
+    def files(self) -> dict[str, str]:
+        """Content of every file of the index keyed by its path relative to the search directory.
+        `index.json` lists the shards along with the digest of every other file.
+        """
+
+        files = {}
+        for prefix, shard in self.shards().items():
+            files[f"terms/{prefix}.json"] = json.dumps(
+                {term: _deltas(postings) for term, postings in shard.items()},
+                separators=(",", ":"),
+            )
+        for start in range(0, len(self.docs), DOCS_PER_SHARD):
+            files[f"docs/{start // DOCS_PER_SHARD}.json"] = json.dumps(
+                self.docs[start:start + DOCS_PER_SHARD],
+                separators=(",", ":"),
+            )
+
+        files["index.json"] = json.dumps(
+            {
+                "prefix": PREFIX_LENGTH,
+                "docs": len(self.docs),
+                "docs_per_shard": DOCS_PER_SHARD,
+                "files": {path: _digest(content) for path, content in sorted(files.items())},
+            },
+            separators=(",", ":"),
+        )
+        return files
+
+def _deltas(postings: list[int]) -> list[int]:
+    return [posting - previous for previous, posting in zip([0, *postings], postings)]
+
+def _docstring(obj) -> str:
+    # The docstring as written, before references were resolved to markdown links
+    source = getattr(obj, "_source_docstring", None)
+    return source if source is not None else obj.docstring
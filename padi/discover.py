@@ -0,0 +1,259 @@
+from __future__ import annotations
+import os
+from pathlib import Path
+import re
+from typing import Iterable
+
+__all__ = [
+    "DEFAULT_EXCLUDE",
+    "GitIgnore",
+    "discover",
+    "select",
+]
+
+DEFAULT_EXCLUDE = [".*", "__pycache__", "node_modules", "venv", "site-packages"]
+"""Directories that never contain documentable modules. Pruned unless they are explicitly
+included.
+"""
+
+def _translate(pattern: str) -> re.Pattern:
+    """Translate a glob to a regex matched against a `/` separated relative path. `**` matches any
+    number of directories while `*` and `?` never match a `/`.
+    """
+
+    regex = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            regex.append(".*")
+            i += 2
+            continue
+
+        if char == "*":
+            regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[" and "]" in pattern[i + 1:]:
+            end = pattern.index("]", i + 1)
+            group = pattern[i + 1:end]
+            if group.startswith("!"):
+                group = "^" + group[1:]
+            regex.append(f"[{group}]")
+            i = end
+        elif char == "\\" and i + 1 < len(pattern):
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return re.compile("".join(regex) + r"\Z")
+
+class _Pattern:
+    """A glob that matches the name of an entry when it has no `/` and otherwise matches the entry's
+    whole path relative to the patterns base directory.
+    """
+
+    def __init__(self, pattern: str, base: str = "") -> None:
+        self.dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        self.anchored = "/" in pattern
+        self.base = base
+        self.regex = _translate(pattern.lstrip("/"))
+
+    def match(self, path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+
+        if self.base != "":
+            if not path.startswith(self.base + "/"):
+                return False
+            path = path[len(self.base) + 1:]
+
+        if self.anchored:
+            return self.regex.match(path) is not None
+        return self.regex.match(path.rsplit("/", 1)[-1]) is not None
+
+class GitIgnore:
+    """The rules of a single `.gitignore` file. Rules are matched against `/` separated paths that
+    share the same root as `base`.
+    """
+
+    def __init__(self, lines: Iterable[str], base: str = "") -> None:
+        self.rules: list[tuple[_Pattern, bool]] = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if line == "" or line.startswith("#"):
+                continue
+
+            negate = line.startswith("!")
+            if negate or line.startswith("\\!") or line.startswith("\\#"):
+                line = line[1:]
+            self.rules.append((_Pattern(line, base), negate))
+
+    @classmethod
+    def load(cls, path: Path, base: str = "") -> GitIgnore:
+        with open(path, "r", encoding="utf-8", errors="replace") as file:
+            return cls(file.readlines(), base)
+
+    def ignored(self, path: str, is_dir: bool, default: bool = False) -> bool:
+        """Whether the path is ignored. The last matching rule wins and `default` is returned if no
+        rules match.
+        """
+
+        result = default
+        for pattern, negate in self.rules:
+            if pattern.match(path, is_dir):
+                result = not negate
+        return result
+
+def _parent_gitignores(root: Path) -> list[_Rebased]:
+    """The `.gitignore` files of the directories above root up to the containing git repository."""
+
+    root = root.resolve()
+    found = []
+    for depth, parent in enumerate(root.parents, start=1):
+        if parent.joinpath(".gitignore").is_file():
+            # Rules are matched against paths relative to root so prefix them with the path from
+            # the parent down to root.
+            base = "/".join(root.parts[len(root.parts) - depth:])
+            found.append((parent.joinpath(".gitignore"), base))
+        if parent.joinpath(".git").exists():
+            break
+
+    return [_Rebased(GitIgnore.load(path), base) for path, base in reversed(found)]
+
+class _Rebased:
+    """A `.gitignore` from above the walked root. Paths are prefixed with the path from the
+    `.gitignore` down to the root before matching.
+    """
+
+    def __init__(self, gitignore: GitIgnore, prefix: str) -> None:
+        self.gitignore = gitignore
+        self.prefix = prefix
+
+    def ignored(self, path: str, is_dir: bool, default: bool = False) -> bool:
+        return self.gitignore.ignored(f"{self.prefix}/{path}", is_dir, default)
+
+class _Filters:
+    """The include, exclude, and ignore rules of `discover` for paths relative to a module."""
+
+    def __init__(
+        self,
+        include: Iterable[str] | None,
+        exclude: Iterable[str] | None,
+        ignore: Iterable[str],
+    ) -> None:
+        self.includes = [_Pattern(pattern) for pattern in include or []]
+        self.excludes = [_Pattern(pattern) for pattern in exclude or []]
+        self.defaults = [_Pattern(pattern) for pattern in DEFAULT_EXCLUDE]
+        self.ignore = set(ignore)
+
+    def pruned(self, path: str, ignores: list) -> bool:
+        if any(pattern.match(path, True) for pattern in self.excludes):
+            return True
+        if any(pattern.match(path, True) for pattern in self.defaults) and not any(
+            pattern.match(path, True) for pattern in self.includes
+        ):
+            return True
+
+        ignored = False
+        for rules in ignores:
+            ignored = rules.ignored(path, True, ignored)
+        return ignored
+
+    def kept(self, path: str, name: str, ignores: list) -> bool:
+        if not name.endswith(".py") or name in self.ignore:
+            return False
+        if len(self.includes) > 0 and not any(
+            pattern.match(path, False) for pattern in self.includes
+        ):
+            return False
+        if any(pattern.match(path, False) for pattern in self.excludes):
+            return False
+
+        ignored = False
+        for rules in ignores:
+            ignored = rules.ignored(path, False, ignored)
+        return not ignored
+
+def discover(
+    module: str | Path,
+    *,
+    include: Iterable[str] | None = None,
+    exclude: Iterable[str] | None = None,
+    gitignore: bool = True,
+    ignore: Iterable[str] = (),
+) -> list[Path]:
+    """Find all the python files of a module.
+
+    The module is walked with `os.scandir` and excluded directories are pruned without being
+    entered. Paths are matched relative to the module. `include` and `exclude` are globs where a
+    glob without a `/` matches an entry's name. A file is kept if it is a `.py` file, matches an
+    include glob when any are given, and doesn't match an exclude glob, a `.gitignore` rule, or a
+    name in `ignore`. Directories in `DEFAULT_EXCLUDE` are pruned unless explicitly included.
+
+    Returns the sorted paths of the files, each starting with `module`.
+    """
+
+    root = Path(module)
+    filters = _Filters(include, exclude, ignore)
+
+    files = []
+    stack: list[tuple[str, list]] = [("", _parent_gitignores(root) if gitignore else [])]
+    while len(stack) > 0:
+        relative, ignores = stack.pop()
+        directory = root.joinpath(relative) if relative != "" else root
+        try:
+            with os.scandir(directory) as iterator:
+                entries = list(iterator)
+        except OSError:
+            continue
+
+        if gitignore and any(entry.name == ".gitignore" for entry in entries):
+            ignores = [*ignores, GitIgnore.load(directory.joinpath(".gitignore"), relative)]
+
+        for entry in entries:
+            path = f"{relative}/{entry.name}" if relative != "" else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if not filters.pruned(path, ignores):
+                    stack.append((path, ignores))
+            elif entry.is_file() and filters.kept(path, entry.name, ignores):
+                files.append(path)
+
+    return [root.joinpath(path) for path in sorted(files)]
+
+def select(
+    paths: Iterable[str],
+    *,
+    include: Iterable[str] | None = None,
+    exclude: Iterable[str] | None = None,
+    ignore: Iterable[str] = (),
+) -> list[str]:
+    """Filter the `/` separated paths of the files of a module with the same rules as `discover`,
+    for modules that aren't a directory on disk like the members of an archive. Paths are relative
+    to the module and a file is dropped if any of its parent directories would have been pruned.
+
+    Returns the kept paths sorted.
+    """
+
+    filters = _Filters(include, exclude, ignore)
+    pruned: dict[str, bool] = {}
+
+    def in_pruned(path: str) -> bool:
+        parent = path.rpartition("/")[0]
+        if parent == "":
+            return False
+        if parent not in pruned:
+            pruned[parent] = in_pruned(parent) or filters.pruned(parent, [])
+        return pruned[parent]
+
+    return sorted(
+        path
+        for path in paths
+        if not in_pruned(path) and filters.kept(path, path.rsplit("/", 1)[-1], [])
+    )
@@ -0,0 +1,259 @@
+from __future__ import annotations
+import json
+
+from .nodes import File, Module
+from .nodes.file_objects import Import
+
+__all__ = [
+    "ImportGraph",
+]
+
+class ImportGraph:
+    """Dependency graph of the files of a module tree built from their top level imports.
+
+    Every file is a node keyed by its dotted path, `__init__.py` files by the path of their module.
+    `edges` maps each file to the files it imports and `reverse` maps each file to the files that
+    import it. Imports that don't resolve to a file of the tree are kept in `external`.
+
+    Importing a file also runs the `__init__.py` of every package above it. `package` maps each
+    file to the closest package `__init__.py` above it, if any, and `members` maps each package
+    to the files right below it. These implicit edges count towards `loads` and how often a file
+    is imported but not towards `cycles`, since a package importing its own files is not a cycle
+    anyone has to break.
+
+    The graph is built in one pass over the imports of every file. An import resolves to the most
+    specific file of the tree it names, so `import package.sub.file` depends on
+    `package.sub.file` and `from package.sub import name` depends on `package.sub.name` if it is a
+    file and `package.sub` otherwise.
+    """
+
+    def __init__(self, root: Module) -> None:
+        self.root = root
+        self.files: dict[str, File] = {}
+        for file in root.all_files():
+            self.files.setdefault(file.dotted_path, file)
+
+        self.edges: dict[str, list[str]] = {path: [] for path in self.files}
+        self.reverse: dict[str, list[str]] = {path: [] for path in self.files}
+        self.external: dict[str, list[str]] = {path: [] for path in self.files}
+        self.package: dict[str, str | None] = {}
+        self.members: dict[str, list[str]] = {path: [] for path in self.files}
+
+        for path, file in self.files.items():
+            targets: dict[str, None] = {}
+            external: dict[str, None] = {}
+            for _import in file.imports:
+                for target, name in self._resolve(file, _import):
+                    if target is None:
+                        external[name] = None
+                    elif target != path:
+                        targets[target] = None
+
+            self.edges[path] = list(targets)
+            self.external[path] = list(external)
+            for target in targets:
+                self.reverse[target].append(path)
+
+            package = self._find(path.rpartition(".")[0])
+            self.package[path] = package
+            if package is not None:
+                self.members[package].append(path)
+
+    def _find(self, name: str) -> str | None:
+        """The longest leading part of a dotted name that is a file of the tree."""
+
+        while name != "":
+            if name in self.files:
+                return name
+            name = name.rpartition(".")[0]
+        return None
+
+    def _package(self, file: File) -> str:
+        if file.file_name == "__init__.py" or file.parent is None:
+            return file.dotted_path
+        return file.parent.dotted_path
+
+    def _resolve(self, file: File, _import: Import) -> list[tuple[str | None, str]]:
+        """Files an import depends on paired with the name that was imported."""
+
+        if _import.level < 0:
+            return [(self._find(name), name) for name in _import.names]
+
+        module = _import.module if isinstance(_import.module, str) else ""
+        if _import.is_relative:
+            parts = self._package(file).split(".")
+            if _import.level - 1 >= len(parts):
+                # Relative import beyond the top of the tree
+                return [(None, "." * _import.level + module)]
+            base = ".".join(parts[:len(parts) - _import.level + 1])
+            if module != "":
+                base = f"{base}.{module}"
+        else:
+            base = module
+
+        resolved: list[tuple[str | None, str]] = []
+        for name in _import.names:
+            if f"{base}.{name}" in self.files:
+                resolved.append((f"{base}.{name}", f"{base}.{name}"))
+            else:
+                resolved.append((self._find(base), base))
+        return resolved
+
+    def _targets(self, path: str, implicit: bool) -> list[str]:
+        package = self.package[path]
+        if implicit and package is not None:
+            return [*self.edges[path], package]
+        return self.edges[path]
+
+    def importers(self, path: str) -> list[str]:
+        """Files that import a file directly or, for a package, implicitly by being in it."""
+        return list(dict.fromkeys([*self.reverse[path], *self.members[path]]))
+
+    def components(self, implicit: bool = False) -> list[list[str]]:
+        """Strongly connected components of the graph. A component is listed after every
+        component it imports. With `implicit` the package `__init__.py` every file loads counts as
+        an import.
+        """
+
+        index: dict[str, int] = {}
+        low: dict[str, int] = {}
+        stack: list[str] = []
+        on_stack: set[str] = set()
+        components = []
+
+        for start in self.edges:
+            if start in index:
+                continue
+
+            # Iterative Tarjan so deep import chains don't hit the recursion limit
+            work = [(start, iter(self._targets(start, implicit)))]
+            index[start] = low[start] = len(index)
+            stack.append(start)
+            on_stack.add(start)
+            while len(work) > 0:
+                node, targets = work[-1]
+                for target in targets:
+                    if target not in index:
+                        index[target] = low[target] = len(index)
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(self._targets(target, implicit))))
+                        break
+                    if target in on_stack:
+                        low[node] = min(low[node], index[target])
+                else:
+                    work.pop()
+                    if len(work) > 0:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
+        return components
+
+    def cycles(self) -> list[list[str]]:
+        """Every group of files that import each other, directly or through other files."""
+
+        return sorted(
+            sorted(component)
+            for component in self.components()
+            if len(component) > 1
+        )
+
+    def loads(self) -> dict[str, int]:
+        """Number of other files of the tree that are run, directly or indirectly, when each file
+        is imported. This includes the `__init__.py` of every package above the file and above
+        everything it imports.
+        """
+
+        bit = {path: 1 << position for position, path in enumerate(self.files)}
+        reach: dict[str, int] = {}
+        for component in self.components(implicit=True):
+            # Components that are imported are always done before the components importing them
+            bits = 0
+            for path in component:
+                bits |= bit[path]
+                for target in self._targets(path, implicit=True):
+                    if target in reach:
+                        bits |= reach[target]
+            for path in component:
+                reach[path] = bits
+
+        return {path: bin(reach[path] & ~bit[path]).count("1") for path in self.files}
+
+    def to_json(self) -> str:
+        loads = self.loads()
+        return json.dumps(
+            {
+                "root": self.root.dotted_path,
+                "modules": {
+                    path: {
+                        "path": file.full_path.as_posix(),
+                        "imports": self.edges[path],
+                        "imported_by": self.reverse[path],
+                        "package": self.package[path],
+                        "external": self.external[path],
+                        "loads": loads[path],
+                    }
+                    for path, file in self.files.items()
+                },
+                "cycles": self.cycles(),
+            },
+            indent=2,
+        )
+
+    def to_dot(self) -> str:
+        """The graph in graphviz DOT format. Files that are part of a cycle are colored red and the
+        implicit edges to packages are dashed.
+        """
+
+        cycle_of = {path: number for number, cycle in enumerate(self.cycles()) for path in cycle}
+        lines = [f"digraph {json.dumps(self.root.dotted_path)} {{", "    node [shape=box];"]
+        for path in self.files:
+            color = " [color=red]" if path in cycle_of else ""
+            lines.append(f"    {json.dumps(path)}{color};")
+        for path, targets in self.edges.items():
+            for target in targets:
+                same = path in cycle_of and cycle_of[path] == cycle_of.get(target)
+                color = " [color=red]" if same else ""
+                lines.append(f"    {json.dumps(path)} -> {json.dumps(target)}{color};")
+        for path, package in self.package.items():
+            if package is not None:
+                lines.append(f"    {json.dumps(path)} -> {json.dumps(package)} [style=dashed];")
+        lines.append("}")
+        return "\n".join(lines)
+
+    def summary(self, top: int = 10) -> str:
+        """Counts of the graph followed by the files imported by the most files, counting the files
+        of a package for its `__init__.py`, and the files that load the most files when imported.
+        """
+
+        cycles = self.cycles()
+        lines = [
+            f"{len(self.files)} files, {sum(len(targets) for targets in self.edges.values())} "
+            f"imports, {len(cycles)} cycle(s)"
+        ]
+        if top > 0 and len(self.files) > 0:
+            fan_in = sorted(
+                ((path, self.importers(path)) for path in self.files),
+                key=lambda item: len(item[1]),
+                reverse=True,
+            )
+            lines.append("Most imported:")
+            for path, sources in fan_in[:top]:
+                lines.append(f"  {len(sources):>6}  {path}")
+
+            loads = sorted(self.loads().items(), key=lambda item: item[1], reverse=True)
+            lines.append("Most files loaded on import:")
+            for path, count in loads[:top]:
+                lines.append(f"  {count:>6}  {path}")
+
+        for cycle in cycles:
+            lines.append(f"Cycle: {', '.join(cycle)}")
+        return "\n".join(lines)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+from contextlib import contextmanager
+import gc
+from pathlib import Path
+import pickle
+from typing import Iterator
+import zlib
+
+from . import __version__
+from .atomic import replacing
+from .nodes.file_system import File, FileModel, Module
+
+__all__ = [
+    "IR_VERSION",
+    "dump_ir",
+    "load_ir",
+]
+
+IR_VERSION = 1
+"""Version of the IR format. Bumped whenever the layout of the IR changes."""
+
+MAGIC = b"PADI-IR\n"
+"""First bytes of every IR file."""
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Pause the cyclic garbage collector. A tree has hundreds of objects per file and none
+    of them are garbage while it is being written or read, but the collector would still walk
+    them over and over as they are created. This makes reading an IR several times faster.
+    """
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def _model(file: File) -> FileModel:
+    return FileModel(file.docstring, file.objects, file.imports, file.digest)
+
+def dump_ir(root: Module, path: str | Path):
+    """Write the whole tree of a module to an IR file.
+
+    The IR holds the path of every file along with everything extracted from it: the docstrings,
+    signatures, annotations, defaults, and imports of every object. It is a zlib compressed pickle
+    of the same models the parse cache stores, behind a header with the IR and padi version.
+    """
+
+    ir = {
+        "module": root.name,
+        "files": [(file.full_path.as_posix(), _model(file)) for file in root.all_files()],
+    }
+    header = f"{IR_VERSION} {__version__}\n".encode("utf-8")
+    with _gc_paused():
+        data = zlib.compress(pickle.dumps(ir, protocol=pickle.HIGHEST_PROTOCOL), 6)
+
+    with replacing(path) as temp:
+        with open(temp, "wb") as file:
+            file.write(MAGIC + header + data)
+
+def load_ir(path: str | Path) -> Module:
+    """Rebuild the tree of a module from an IR file without parsing any python. The tree is the
+    same as the one `construct_module` built when the IR was written.
+
+    Raises a `ValueError` if the file isn't an IR or was written by a different version of padi.
+    The IR is a pickle so only load IR files from a trusted source.
+    """
+
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{str(path)!r} is not a padi IR file")
+    header, _, data = data[len(MAGIC):].partition(b"\n")
+    version, _, padi_version = header.decode("utf-8").partition(" ")
+    if version != str(IR_VERSION) or padi_version != __version__:
+        raise ValueError(
+            f"{str(path)!r} is version {version} of the IR written by padi {padi_version}, "
+            f"this is padi {__version__} which reads version {IR_VERSION}. Extract it again."
+        )
+
+    with _gc_paused():
+        ir = pickle.loads(zlib.decompress(data))
+        root = Module(ir["module"], ir["module"])
+        for full_path, model in ir["files"]:
+            root.add(full_path, model=model)
+    return root
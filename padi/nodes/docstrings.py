@@ -0,0 +1,114 @@
+from __future__ import annotations
+import hashlib
+from pathlib import Path
+import pickle
+
+from markdown import Markdown
+
+from .. import __version__
+from ..atomic import replacing
+from ..profiling import span
+
+__all__ = [
+    "MAX_ENTRIES",
+    "DocstringCache",
+    "clean_docstring",
+    "docstrings",
+]
+
+MAX_ENTRIES = 50_000
+"""Most rendered docstrings kept in the cache file. The least recently used are dropped first."""
+
+def clean_docstring(content: str) -> str:
+    """Strip a docstring and dedent every line after the first."""
+
+    lines = content.strip().split("\n")
+    indents = [len(line) - len(line.lstrip()) for line in lines[1:] if line.strip() != ""]
+    indent = 0
+    for i in indents:
+        if i > indent:
+            indent = i
+
+    for i, line in enumerate(lines[1:]):
+        offset = max(0, len(line) - len(line.lstrip()) - indent)
+        lines[i+1] = ' ' * offset + line.lstrip()
+
+    return "\n".join(lines)
+
+class DocstringCache:
+    """Rendered html of docstrings keyed by the content hash of the docstring.
+
+    Docstrings are rendered with the same markdown extensions as phml's `<Markdown />` element.
+    The cache can be loaded from and saved to disk to be reused across builds. Entries are kept
+    from the least to the most recently used so only the `MAX_ENTRIES` most recent are saved and
+    docstrings that were edited away eventually leave the file.
+    """
+
+    EXTENSIONS = ["codehilite", "tables", "fenced_code"]
+
+    def __init__(self) -> None:
+        self.entries: dict[str, str] = {}
+        self.added: dict[str, str] = {}
+        self.path: Path | None = None
+        self._markdown = Markdown(extensions=self.EXTENSIONS)
+
+    def key(self, content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def render(self, content: str) -> str:
+        """Get the html of a markdown docstring, rendering it only if it isn't cached."""
+
+        key = self.key(content)
+        # Moved to the end as the most recently used
+        html = self.entries.pop(key, None)
+        if html is None:
+            with span("markdown", "docstring"):
+                html = self._markdown.reset().convert(content)
+            self.added[key] = html
+        self.entries[key] = html
+        return html
+
+    def load(self, path: str | Path):
+        """Use the cache file at the path. Entries already in the file are added to the cache."""
+
+        self.path = Path(path)
+        try:
+            with open(self.path, "rb") as file:
+                data = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return
+
+        if isinstance(data, dict) and data.get("version") == __version__:
+            self.entries.update(data.get("entries", {}))
+
+    def merge(self, entries: dict[str, str]):
+        """Add entries rendered elsewhere, for example by another process."""
+
+        for key, html in entries.items():
+            if key not in self.entries:
+                self.added[key] = html
+            self.entries.pop(key, None)
+            self.entries[key] = html
+
+    def save(self):
+        """Write the cache back to the file it was loaded from if anything was added."""
+
+        if self.path is None or len(self.added) == 0:
+            return
+
+        if len(self.entries) > MAX_ENTRIES:
+            keys = list(self.entries)
+            for key in keys[:len(keys) - MAX_ENTRIES]:
+                del self.entries[key]
+
+        with replacing(self.path) as temp:
+            with open(temp, "wb") as file:
+                pickle.dump(
+                    {"version": __version__, "entries": self.entries},
+                    file,
+                    protocol=pickle.HIGHEST_PROTOCOL
+                )
+        self.added.clear()
+
+docstrings = DocstringCache()
+"""Cache every docstring of the current process is rendered through."""
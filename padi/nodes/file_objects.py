@@ -1,8 +1,7 @@
 from __future__ import annotations
 import ast
-from markdown2 import Markdown
 
-md = Markdown(extras=["smarty-pants", "strike", "fenced-code-blocks"])
+from .docstrings import clean_docstring, docstrings
 
 __all__ = [
     "MISSING",
@@ -13,15 +12,29 @@ __all__ = [
     "AnnAssign",
     "Class",
     "Method",
-    "Argument"
+    "Argument",
+    "Expression",
 ]
 
-class FONode: pass
+class FONode:
+    # Objects are created for every symbol of every file so none of them keep a `__dict__`
+    __slots__ = ()
+
+    def __deepcopy__(self, memo: dict) -> FONode:
+        # Objects are never modified while rendering. Templates copy their context for every loop
+        # iteration so sharing them avoids copying the whole tree for each one.
+        return self
 
 class Missing(FONode): 
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return f"MISSING"
 
+    def __reduce__(self) -> str:
+        # Unpickle to the shared sentinel so `is`/`!=` comparisons keep working
+        return "MISSING"
+
 MISSING = Missing()
 
 def get_value(default):
@@ -35,9 +48,13 @@ def get_value(default):
         return Attribute(default)
     if isinstance(default, ast.Call):
         return Call(default)
+    if isinstance(default, ast.AST):
+        return Expression(default)
     return default
 
 class DocObject(FONode):
+    __slots__ = ("_docstring", "_html", "_source_docstring")
+
     def __init__(self) -> None:
         self._docstring = ""
 
@@ -55,20 +72,20 @@ class DocObject(FONode):
     
     @docstring.setter
     def docstring(self, content: str) -> str:
-        content = content.strip().split("\n")
-        indents = [len(line) - len(line.lstrip()) for line in content[1:] if line.strip() != ""]
-        indent = 0
-        for i in indents:
-            if i > indent:
-                indent = i
-        
-        for i, line in enumerate(content[1:]):
-            offset = max(0, len(line) - len(line.lstrip()) - indent)
-            content[i+1] = ' ' * offset + line.lstrip()
+        self._docstring = clean_docstring(content)
+
+    @property
+    def html(self) -> str:
+        """The docstring rendered to html. Only rendered again if the docstring changes."""
 
-        self._docstring = "\n".join(content)
+        rendered = getattr(self, "_html", None)
+        if rendered is None or rendered[0] is not self._docstring:
+            rendered = self._html = (self._docstring, docstrings.render(self._docstring))
+        return rendered[1]
 
 class Annotation(FONode):
+    __slots__ = ("annotations",)
+
     def __init__(self, annotation) -> None:
         self.annotations = []
         if isinstance(annotation, ast.Name):
@@ -85,6 +102,8 @@ class Annotation(FONode):
             raise TypeError(f"Unkown annotation type {annotation}")
 
     class Or(FONode):
+        __slots__ = ("left", "right")
+
         def __init__(self, ops: ast.BinOp) -> None:
             self.left = Annotation(ops.left)
             self.right = Annotation(ops.right)
@@ -93,6 +112,8 @@ class Annotation(FONode):
             return f"{self.left} | {self.right}"
             
     class Subscript(FONode):
+        __slots__ = ("name", "annotations")
+
         def __init__(self, subscript: ast.Subscript) -> None:
             self.name = subscript.value.id
             self.annotations = []
@@ -107,6 +128,8 @@ class Annotation(FONode):
         return ", ".join(str(annotation) for annotation in self.annotations)
 
 class Collection(FONode):
+    __slots__ = ("brackets", "elements", "trailing")
+
     def __init__(self, collection: ast.List | ast.Tuple | ast.Set) -> None:
         self.brackets = ["(", ")"] if isinstance(collection, (ast.Tuple, ast.Set)) else ["[", "]"]
         self.elements = [get_value(element) for element in collection.elts]
@@ -125,6 +148,8 @@ class Collection(FONode):
 {self.brackets[1]}{self.trailing}"
 
 class Attribute(FONode):
+    __slots__ = ("name", "attr")
+
     def __init__(self, attr: ast.Attribute) -> None:
         self.name = get_value(attr.value)
         self.attr = get_value(attr.attr)
@@ -136,6 +161,8 @@ class Attribute(FONode):
         return f"Attr({self.name}, attr: {self.attr})"
 
 class Assign(DocObject, FONode):
+    __slots__ = ("name", "value")
+
     def __init__(self, attr: ast.Assign) -> None:
         super().__init__()
         self.name = attr.targets[0].id
@@ -162,6 +189,8 @@ class Assign(DocObject, FONode):
         return f"{self.name}{value}"
     
 class AnnAssign(DocObject, FONode):
+    __slots__ = ("name", "annotation", "value", "simple")
+
     def __init__(self, attr: ast.AnnAssign) -> None:
         super().__init__()
         self.name = attr.target.id
@@ -190,7 +219,23 @@ class AnnAssign(DocObject, FONode):
         )
         return f"{self.name}{annotation}{value}"
 
+class Expression(FONode):
+    """Any other expression, kept as its source instead of the ast node it was parsed from."""
+
+    __slots__ = ("source",)
+
+    def __init__(self, expression: ast.AST) -> None:
+        self.source = ast.unparse(expression)
+
+    def __str__(self) -> str:
+        return self.source
+
+    def __repr__(self) -> str:
+        return f"Expr({self.source})"
+
 class Starred(FONode):
+    __slots__ = ("name",)
+
     def __init__(self, starred: ast.Starred) -> None:
         self.name = get_value(starred.value)
     
@@ -198,6 +243,8 @@ class Starred(FONode):
         return f"*{self.name}"
 
 class Keyword(FONode):
+    __slots__ = ("name", "value")
+
     def __init__(self, keyword: ast.keyword) -> None:
         self.name = keyword.arg or MISSING
         self.value = get_value(keyword.value)
@@ -209,6 +256,8 @@ class Keyword(FONode):
             return f"{self.name}={self.name}"
 
 class Call(FONode):
+    __slots__ = ("name", "args", "keywords")
+
     def __init__(self, _call: ast.Call) -> None:
         self.name = get_value(_call.func)
         self.args = [get_value(arg) for arg in _call.args]
@@ -223,6 +272,8 @@ class Call(FONode):
         return f"{self.name}({', '.join(str(arg) for arg in args)})"
 
 class Class(DocObject, FONode):
+    __slots__ = ("attributes", "methods", "classes", "bases", "name")
+
     def __init__(self, klass: ast.ClassDef) -> None:
         super().__init__()
         self.attributes = []
@@ -274,6 +325,8 @@ class Class(DocObject, FONode):
         return "\n".join(out)
 
 class Argument(FONode):
+    __slots__ = ("name", "annotation", "default")
+
     def __init__(self, arg: ast.arg) -> None:
         self.name = arg.arg
         self.annotation = Annotation(arg.annotation) if arg.annotation is not None else MISSING
@@ -292,6 +345,8 @@ class Argument(FONode):
         return f"Arg({self.name!r}, {self.annotation!r}, {self.default!r})"
 
 class Import(DocObject, FONode):
+    __slots__ = ("module", "names", "level")
+
     def __init__(self, _import: ast.Import | ast.ImportFrom) -> None:
         super().__init__()
         self.module = MISSING
@@ -319,6 +374,17 @@ class Import(DocObject, FONode):
         return  f"Import(from: {self.module!r}, names: [{f', '.join(self.names)}, lvl: {self.level}])"
 
 class Method(DocObject, FONode):
+    __slots__ = (
+        "name",
+        "decorators",
+        "posonlyargs",
+        "args",
+        "kwonlyargs",
+        "vararg",
+        "kwarg",
+        "returns",
+    )
+
     args: list
     """Methods arguments"""
     
@@ -1,60 +1,190 @@
 from __future__ import annotations
 import ast
-from collections import OrderedDict
+from bisect import bisect_left, insort
+import hashlib
+from collections import Counter, OrderedDict
 from functools import cached_property
 from pathlib import Path
-from typing import Iterator
-from markdown import Markdown
-
-md = Markdown()
+from typing import TYPE_CHECKING, Iterator
 
+from ..profiling import span
+from .docstrings import clean_docstring, docstrings
 from .file_objects import Method, Class, Assign, AnnAssign, Import
 
+if TYPE_CHECKING:
+    from ..cache import ParseCache
+    from ..sources import SourceProvider
+
 __all__ = [
     "File",
-    "Module"
+    "FileModel",
+    "Module",
+    "extract",
+    "parse_counts",
+    "read_source",
+    "source_digest",
 ]
 
 DocObject = Method | Class | Assign | AnnAssign
 
-class FSNode: pass
+parse_counts: Counter[Path] = Counter()
+"""Number of times each source file has been run through `ast.parse`, keyed by its full path."""
+
+class FileModel:
+    """The docstring, documented objects, and imports extracted from a python file."""
+
+    __slots__ = ("docstring", "objects", "imports", "digest")
+
+    def __init__(
+        self,
+        docstring: str = "",
+        objects: list[DocObject] | None = None,
+        imports: list[Import] | None = None,
+        digest: str = "",
+    ) -> None:
+        self.docstring = docstring
+        self.objects = objects or []
+        self.imports = imports or []
+        self.digest = digest
+
+def read_source(full_path: str | Path) -> str:
+    with open(full_path, "r", encoding="utf-8") as file:
+        output = file.read()
+    return output
+
+def source_digest(source: str) -> str:
+    """Content hash of a python source."""
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+def extract(source: str, full_path: str | Path) -> FileModel:
+    """Parse a python source once and extract everything needed to document it."""
+
+    parse_counts[Path(full_path)] += 1
+    with span("parse", "file", file=str(full_path)):
+        f_ast = ast.parse(source, full_path)
+
+    with span("extract", "file", file=str(full_path)):
+        return _extract_model(f_ast, source_digest(source))
+
+def _extract_model(f_ast: ast.Module, digest: str) -> FileModel:
+    model = FileModel(digest=digest)
+
+    if (
+        len(f_ast.body) > 0
+        and isinstance(f_ast.body[0], ast.Expr)
+        and isinstance(f_ast.body[0].value, ast.Constant)
+        and isinstance(f_ast.body[0].value.value, str)
+    ):
+        model.docstring = f_ast.body[0].value.value
+
+    previous = ""
+    for elem in f_ast.body:
+        if isinstance(elem, ast.FunctionDef):
+            model.objects.append(Method(elem))
+            previous = "method"
+        elif isinstance(elem, ast.ClassDef):
+            model.objects.append(Class(elem))
+            previous = "class"
+        elif isinstance(elem, ast.Assign):
+            model.objects.append(Assign(elem))
+            previous = "assign"
+        elif isinstance(elem, ast.AnnAssign):
+            model.objects.append(AnnAssign(elem))
+            previous = "assign"
+        elif (
+            isinstance(elem, ast.Expr)
+            and previous == "assign"
+            and isinstance(elem.value, ast.Constant)
+            and isinstance(elem.value.value, str)
+        ):
+            model.objects[-1].docstring = elem.value.value
+            previous = "expr"
+        elif isinstance(elem, (ast.Import, ast.ImportFrom)):
+            model.imports.append(Import(elem))
+            previous = ""
+        else:
+            # Unhandled ast node
+            previous = ""
+    return model
+
+class FSNode:
+    def __deepcopy__(self, memo: dict) -> FSNode:
+        # Files and modules link to the whole tree so they are shared instead of copied, the same
+        # as the objects in them.
+        return self
 
 class File(FSNode):
-    def __init__(self, path: str | Path, full_path: str | Path) -> None:
+    DERIVED = ("source", "public", "protected", "private", "methods", "classes", "Assignments")
+    """Cached properties that are computed from the source or objects of the file."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        full_path: str | Path,
+        *,
+        cache: ParseCache | None = None,
+        model: FileModel | None = None,
+        provider: SourceProvider | None = None,
+    ) -> None:
         self.path = path if isinstance(path, Path) else Path(path)
         self.full_path = full_path if isinstance(full_path, Path) else Path(full_path)
         self._docstring = ""
         self.parent: Module | None = None
-        if not self.full_path.is_file():
-            raise TypeError(f"{self.path.as_posix()!r} is not a file.")
-        
-        f_ast = ast.parse(self.source, self.full_path)
-        if (
-            len(f_ast.body) > 0
-            and isinstance(f_ast.body[0], ast.Expr)
-            and isinstance(f_ast.body[0].value, ast.Constant)
-            and isinstance(f_ast.body[0].value.value, str)
-        ):
-            self.docstring = f_ast.body[0].value.value
+        self.objects: list[DocObject] = []
+        self.imports: list[Import] = []
+        # Files outside of the working directory, like the members of an archive, are read
+        # through their provider
+        self.provider = provider
+        if model is None:
+            try:
+                # The source is only needed while extracting so it isn't kept on the file
+                if cache is not None:
+                    model = cache.fetch(self.full_path, self._read, provider)
+                else:
+                    model = extract(self._read(), self.full_path)
+            except (FileNotFoundError, IsADirectoryError, NotADirectoryError) as error:
+                raise TypeError(f"{self.path.as_posix()!r} is not a file.") from error
+        self.load(model)
+
+    def _read(self) -> str:
+        if self.provider is not None:
+            return self.provider.read(self.full_path)
+        return read_source(self.full_path)
+
+    def load(self, model: FileModel):
+        """Populate the file from a previously extracted model."""
+
+        if model.docstring != "":
+            self.docstring = model.docstring
+        self.objects = model.objects
+        self.imports = model.imports
+        if model.digest != "":
+            self.digest = model.digest
     
+    def compact(self):
+        """Drop the source and the lists derived from the objects of the file. They are computed
+        again if they are used.
+        """
+
+        for name in self.DERIVED:
+            self.__dict__.pop(name, None)
+
     @property
     def docstring(self) -> str:
         return self._docstring
     
     @docstring.setter
     def docstring(self, content: str) -> str:
-        content = content.strip().split("\n")
-        indents = [len(line) - len(line.lstrip()) for line in content[1:] if line.strip() != ""]
-        indent = 0
-        for i in indents:
-            if i > indent:
-                indent = i
-        
-        for i, line in enumerate(content[1:]):
-            offset = max(0, len(line) - len(line.lstrip()) - indent)
-            content[i+1] = ' ' * offset + line.lstrip()
+        self._docstring = clean_docstring(content)
 
-        self._docstring = "\n".join(content)
+    @property
+    def html(self) -> str:
+        """The docstring rendered to html. Only rendered again if the docstring changes."""
+
+        rendered = getattr(self, "_html", None)
+        if rendered is None or rendered[0] is not self._docstring:
+            rendered = self._html = (self._docstring, docstrings.render(self._docstring))
+        return rendered[1]
     
     @property
     def file_name(self) -> str:
@@ -66,12 +196,24 @@ class File(FSNode):
             return self.parent.name
         return self.path.name.replace(self.path.suffix, "")
 
+    @property
+    def dotted_path(self) -> str:
+        """Import path of the file, for example `package.sub_module.file`. An `__init__.py` file has
+        the same path as its module.
+        """
+
+        if self.parent is None:
+            return self.name
+        if self.file_name == "__init__.py":
+            return self.parent.dotted_path
+        return f"{self.parent.dotted_path}.{self.name}"
+
     @cached_property
     def parents(self) -> list[str]:
         return [path for path in self.path.as_posix().split("/")[:-1] if path.strip() != ""]
 
     @cached_property
-    def url(self) -> list[str]:
+    def url(self) -> str:
         parts = [
                     path 
                     for path in self.full_path.as_posix().split("/")[:-1]
@@ -83,36 +225,13 @@ class File(FSNode):
     
     @cached_property
     def source(self) -> str:
-        with open(self.full_path, "r", encoding="utf-8") as file:
-            output = file.read()
-        return output
+        return self._read()
 
     @cached_property
-    def objects(self) -> list[DocObject]:
-        f_ast = ast.parse(self.source, self.full_path)
-        objects = []
-        previous = ""
-        for elem in f_ast.body:
-            if isinstance(elem, ast.FunctionDef):
-                objects.append(Method(elem))
-                previous = "method"
-            elif isinstance(elem, ast.ClassDef):
-                objects.append(Class(elem))
-                previous = "class"
-            elif isinstance(elem, ast.Assign):
-                objects.append(Assign(elem))
-                previous = "assign"
-            elif isinstance(elem, ast.AnnAssign):
-                objects.append(AnnAssign(elem))
-                previous = "assign"
-            elif isinstance(elem, ast.Expr) and previous == "assign" and isinstance(elem.value.value, str):
-                objects[-1].docstring = elem.value.value
-                previous = "expr"
-            else:
-                # Unhandled ast node
-                previous = ""
-        return objects
-    
+    def digest(self) -> str:
+        """Content hash of the files source."""
+        return source_digest(self.source)
+
     @cached_property
     def protected(self) -> list[DocObject]:
         return [object for object in self.objects if object.name.startswith("_") and not object.name.startswith("__")]
@@ -137,14 +256,6 @@ class File(FSNode):
     def Assignments(self) -> list:
         return [object for object in self.objects if isinstance(object, (Assign, AnnAssign))]
     
-    @cached_property
-    def imports(self) -> list:
-        return [
-            Import.create(node)
-            for node in ast.parse(self.source, self.full_path).body 
-            if isinstance(node, (ast.Import, ast.ImportFrom))
-        ]
-    
     def pretty(self, indent: int = 0) -> str:
         return f"{' '*indent}File({self.file_name!r})"
             
@@ -160,17 +271,88 @@ class Module(FSNode):
         self.path = Path(str(path).replace("\\", "/").strip("/"))
         self.parent = parent
         self.nested: OrderedDict[str, Module|File] = OrderedDict()
+        self._keys: list[str] = []
+        self._index: dict[str, Module | File | DocObject] | None = None
     
     def __iter__(self):
-        nested = OrderedDict(sorted(self.nested.items()))
-        for key, value in nested.items():
-            yield key, value
+        for key in self._keys:
+            yield key, self.nested[key]
             
     def __getitem__(self, key: str):
         return self.nested[key]
     
     def __contains__(self, key: str):
         return key in self.nested
+
+    def _insert(self, key: str, value: Module | File):
+        """Add a child keeping the children sorted by key."""
+
+        if key not in self.nested:
+            insort(self._keys, key)
+        self.nested[key] = value
+
+    def _pop(self, key: str) -> Module | File | None:
+        if key not in self.nested:
+            return None
+        del self._keys[bisect_left(self._keys, key)]
+        return self.nested.pop(key)
+
+    @property
+    def root(self) -> Module:
+        """The top most module of the tree."""
+
+        current = self
+        while current.parent is not None:
+            current = current.parent
+        return current
+
+    @property
+    def dotted_path(self) -> str:
+        """Import path of the module, for example `package.sub_module`."""
+
+        if self.parent is None:
+            return Path(self.name).name
+        return f"{self.parent.dotted_path}.{self.name}"
+
+    @property
+    def index(self) -> dict[str, Module | File | DocObject]:
+        """Every module, file, and symbol of the whole tree keyed by its dotted path. A module
+        shares its path with its `__init__.py` file and maps to the module.
+        """
+
+        root = self.root
+        if root._index is None:
+            index: dict[str, Module | File | DocObject] = {}
+
+            def add_symbols(prefix: str, objects: list):
+                for obj in objects:
+                    path = f"{prefix}.{obj.name}"
+                    index.setdefault(path, obj)
+                    if isinstance(obj, Class):
+                        add_symbols(path, obj.attributes)
+                        add_symbols(path, obj.methods)
+                        add_symbols(path, obj.classes)
+
+            def add_module(module: Module):
+                index[module.dotted_path] = module
+                for _, value in module:
+                    if isinstance(value, Module):
+                        add_module(value)
+                    else:
+                        path = value.dotted_path
+                        index.setdefault(path, value)
+                        add_symbols(path, value.objects)
+
+            add_module(root)
+            root._index = index
+            return index
+        return root._index
+
+    def find(self, path: str) -> Module | File | DocObject | None:
+        """Find a module, file, or symbol anywhere in the tree from its dotted path. For example
+        `package.sub_module.file.Class.method`.
+        """
+        return self.index.get(path)
     
     def all_files(self) -> Iterator[File]:
         def recursive(module: Module):
@@ -183,24 +365,63 @@ class Module(FSNode):
         yield from recursive(self)
     
     @cached_property
-    def url(self) -> list[str]:
+    def url(self) -> str:
         if '__init__.py' in self:
             return self['__init__.py'].url
         else:
             return "/"
     
-    def add(self, obj: str | Path):
+    def add(
+        self,
+        obj: str | Path,
+        cache: ParseCache | None = None,
+        model: FileModel | None = None,
+        provider: SourceProvider | None = None,
+    ):
         path = str(obj).replace("\\", "/").strip("/").lstrip(self.path.as_posix())
-        file = File(path=Path(path), full_path=Path(obj))
+        file = File(
+            path=Path(path),
+            full_path=Path(obj),
+            cache=cache,
+            model=model,
+            provider=provider,
+        )
 
         current = self
         for parent in file.parents:
             if parent not in current:
-                current.nested[parent] = Module(parent, self.path.joinpath(parent), current)
+                current._insert(parent, Module(parent, self.path.joinpath(parent), current))
             current = current[parent]
         if file.file_name not in current.nested:
             file.parent = current
-            current.nested[file.file_name] = file
+            current._insert(file.file_name, file)
+            current.__dict__.pop("url", None)
+            self.root._index = None
+
+    def remove(self, obj: str | Path) -> File | None:
+        """Remove the file at the given path from the tree along with any modules left empty.
+        Returns the removed file if it was in the tree.
+        """
+
+        path = Path(str(obj).replace("\\", "/").strip("/").lstrip(self.path.as_posix()))
+        current = self
+        for parent in [part for part in path.as_posix().split("/")[:-1] if part.strip() != ""]:
+            if parent not in current:
+                return None
+            current = current[parent]
+
+        file = current.nested.get(path.name)
+        if not isinstance(file, File):
+            return None
+
+        current._pop(path.name)
+        current.__dict__.pop("url", None)
+        while current is not self and len(current.nested) == 0 and current.parent is not None:
+            module = current.parent
+            module._pop(current.name)
+            current = module
+        self.root._index = None
+        return file
 
     def files(self) -> Iterator[File]:
         for _, value in self:
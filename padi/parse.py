@@ -1,21 +1,118 @@
-import ast
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+import os
 from pathlib import Path
+from typing import Iterable
 
-from .nodes.file_system import Module
+from .cache import ParseCache
+from . import profiling
+from .discover import discover
+from .nodes.file_system import FileModel, Module, extract, parse_counts
+from .profiling import span
+from .sources import SourceProvider, open_provider
 
 ignore_list = ["__main__.py"]
 """List of files to ignore while building the module tree."""
 
-def construct_module(module: str) -> Module:
-    """Builds the modules and tree of modules from package/library."""
-    root = Module(module, module)
-    for file in Path(module).glob("**/*.py"):
-        if file.name not in ignore_list:
-            root.add(file)
+_parse_state: dict = {}
+"""State of a parse worker process in a parallel parse."""
+
+def _init_parse_worker(cache_dir: str, provider: SourceProvider, profile: bool):
+    _parse_state["cache"] = ParseCache(cache_dir) if cache_dir != "" else None
+    _parse_state["provider"] = provider
+    if profile:
+        profiling.start()
+
+def _extract_file(full_path: Path) -> tuple[FileModel, bool, list[dict]]:
+    """Extract a file inside of a parse worker process. Returns the model, whether the file
+    had to be parsed, and the profiled events of the file if profiling is on.
+    """
+
+    before = parse_counts[full_path]
+    cache = _parse_state.get("cache")
+    provider = _parse_state["provider"]
+    if cache is not None:
+        model = cache.fetch(full_path, lambda: provider.read(full_path), provider)
+    else:
+        model = extract(provider.read(full_path), full_path)
+
+    profiler = profiling.active()
+    events = profiler.drain() if profiler is not None else []
+    return model, parse_counts[full_path] > before, events
+
+def find_files(
+    module: str,
+    *,
+    include: Iterable[str] | None = None,
+    exclude: Iterable[str] | None = None,
+    gitignore: bool = True,
+) -> list[Path]:
+    """Find the python files of a module. See `padi.discover.discover` for the filter rules."""
+    return discover(
+        module,
+        include=include,
+        exclude=exclude,
+        gitignore=gitignore,
+        ignore=ignore_list,
+    )
+
+def construct_module(
+    module: str,
+    *,
+    cache_dir: str = "",
+    jobs: int = 1,
+    include: Iterable[str] | None = None,
+    exclude: Iterable[str] | None = None,
+    gitignore: bool = True,
+) -> Module:
+    """Builds the modules and tree of modules from package/library.
+
+    The module is a directory, a wheel, zip, or tar archive, or the import name of an installed
+    package, see `padi.sources.open_provider`. Files are read through its provider so archives are
+    never extracted. The files of a directory are found with `find_files`, which prunes excluded
+    and git ignored directories while walking the module.
+
+    If `cache_dir` is given, extracted files are stored there and reused on later runs for any
+    source that hasn't changed.
+
+    With more than one job the files are parsed across a pool of worker processes. The tree is
+    always assembled in the same order no matter how many jobs are used. `0` uses one per cpu.
+    """
+    if jobs < 1:
+        jobs = os.cpu_count() or 1
+
+    provider = open_provider(module)
+    root = Module(provider.name, provider.name)
+    with span("discover"):
+        files = provider.files(
+            include=include,
+            exclude=exclude,
+            gitignore=gitignore,
+            ignore=ignore_list,
+        )
+
+    if jobs > 1 and len(files) > 1:
+        jobs = min(jobs, len(files))
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_parse_worker,
+            initargs=(cache_dir, provider, profiling.active() is not None),
+        ) as pool:
+            results = pool.map(_extract_file, files, chunksize=max(1, len(files) // (jobs * 4)))
+            for file, (model, parsed, events) in zip(files, results):
+                if parsed:
+                    parse_counts[file] += 1
+                profiler = profiling.active()
+                if len(events) > 0 and profiler is not None:
+                    profiler.extend(events)
+                root.add(file, model=model, provider=provider)
+    else:
+        cache = ParseCache(cache_dir) if cache_dir != "" else None
+        for file in files:
+            root.add(file, cache, provider=provider)
     return root
 
 def docstring(module: Module) -> Module:
     """Gets the docstring for a given module from it's __init__ file."""
     if "__init__.py" in module:
-        f_ast = ast.parse(module["__init__.py"].source, module["__init__.py"].full_path)
-        return ast.get_docstring(f_ast) or ""
\ No newline at end of file
+        return module["__init__.py"].docstring
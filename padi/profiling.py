@@ -0,0 +1,163 @@
+from __future__ import annotations
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+import json
+import os
+from pathlib import Path
+import sys
+from time import perf_counter_ns, process_time_ns
+from typing import Iterator
+
+__all__ = [
+    "Profiler",
+    "active",
+    "span",
+    "start",
+    "stop",
+]
+
+class Profiler:
+    """Spans of wall time, cpu time, and allocated memory blocks.
+
+    Spans are kept as Chrome trace events so they can be opened with `chrome://tracing` or
+    Perfetto. Events recorded in worker processes can be added with `extend`, they keep the
+    process id of the worker.
+    """
+
+    def __init__(self) -> None:
+        self.events: list[dict] = []
+        self.pid = os.getpid()
+
+    @contextmanager
+    def span(self, name: str, category: str = "phase", **args) -> Iterator[None]:
+        """Record the time from entering to leaving the span. `args` are shown with the event.
+        The number of allocated memory blocks gained during the span is added as `blocks`.
+        """
+
+        blocks = sys.getallocatedblocks()
+        cpu = process_time_ns()
+        wall = perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = perf_counter_ns() - wall
+            self.events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": wall / 1000,
+                "dur": duration / 1000,
+                "pid": self.pid,
+                "tid": 0,
+                "args": {
+                    **args,
+                    "cpu_ms": round((process_time_ns() - cpu) / 1e6, 3),
+                    "blocks": sys.getallocatedblocks() - blocks,
+                },
+            })
+
+    def extend(self, events: list[dict]):
+        self.events.extend(events)
+
+    def drain(self) -> list[dict]:
+        """Remove and return every event recorded so far."""
+
+        events = self.events
+        self.events = []
+        return events
+
+    def save(self, path: str | Path):
+        """Write the events as a Chrome trace event file."""
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        names = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": name}}
+            for pid, name in self._processes().items()
+        ]
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": [*names, *self.events], "displayTimeUnit": "ms"}, file)
+
+    def _processes(self) -> dict[int, str]:
+        processes = {self.pid: "padi"}
+        for event in self.events:
+            processes.setdefault(event["pid"], f"padi worker {event['pid']}")
+        return processes
+
+    def totals(self) -> dict[str, tuple[float, float, int]]:
+        """Total wall milliseconds, cpu milliseconds, and allocated blocks of every span with the
+        same name, for example every `render` of every page. Spans of workers are included so
+        totals can add up to more than the wall time of the build.
+        """
+
+        totals: dict[str, tuple[float, float, int]] = {}
+        for event in self.events:
+            wall, cpu, blocks = totals.get(event["name"], (0.0, 0.0, 0))
+            totals[event["name"]] = (
+                wall + event["dur"] / 1000,
+                cpu + event["args"]["cpu_ms"],
+                blocks + event["args"]["blocks"],
+            )
+        return totals
+
+    def pages(self) -> dict[str, dict[str, float]]:
+        """Wall milliseconds spent on each page keyed by the page and then by the step."""
+
+        pages: defaultdict[str, defaultdict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for event in self.events:
+            if event["cat"] == "page":
+                pages[event["args"]["page"]][event["name"]] += event["dur"] / 1000
+        return {page: dict(steps) for page, steps in pages.items()}
+
+    def summary(self, top: int = 10) -> str:
+        """The totals of each span followed by the `top` slowest pages and their slowest step."""
+
+        lines = ["Totals:"]
+        for name, (wall, cpu, blocks) in self.totals().items():
+            lines.append(f"  {wall:>10.1f}ms wall {cpu:>10.1f}ms cpu {blocks:>10} blocks  {name}")
+
+        pages = sorted(
+            self.pages().items(),
+            key=lambda page: sum(page[1].values()),
+            reverse=True,
+        )
+        if top > 0 and len(pages) > 0:
+            lines.append(f"Slowest {min(top, len(pages))} of {len(pages)} pages:")
+            for page, steps in pages[:top]:
+                step = max(steps, key=lambda name: steps[name])
+                lines.append(
+                    f"  {sum(steps.values()):>10.1f}ms  {page}  "
+                    f"(slowest step: {step} {steps[step]:.1f}ms)"
+                )
+        return "\n".join(lines)
+
+_profiler: Profiler | None = None
+"""Profiler of the current process while profiling is on."""
+
+def start() -> Profiler:
+    """Start profiling this process. Returns the profiler that records every span."""
+
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+def stop() -> Profiler | None:
+    """Stop profiling and return the profiler that was recording, if any."""
+
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+def active() -> Profiler | None:
+    return _profiler
+
+def span(name: str, category: str = "phase", **args):
+    """A span of the active profiler. Profiling is off unless it is started with `start`, then a
+    context manager that does nothing is returned so instrumented code costs close to nothing.
+    Steps of a single file use the `file` category and steps of a single page use the `page`
+    category and must pass the page as `page`. Only `page` spans are listed as pages.
+    """
+
+    if _profiler is None:
+        return nullcontext()
+    return _profiler.span(name, category, **args)
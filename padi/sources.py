@@ -0,0 +1,292 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+import importlib.util
+import os
+from pathlib import Path, PurePosixPath
+import tarfile
+from typing import Iterable
+import zipfile
+
+from .discover import discover, select
+from .nodes.file_system import read_source
+
+__all__ = [
+    "ARCHIVE_SUFFIXES",
+    "SKIPPED_PACKAGES",
+    "DirectoryProvider",
+    "SourceProvider",
+    "TarProvider",
+    "ZipProvider",
+    "installed",
+    "open_provider",
+]
+
+ARCHIVE_SUFFIXES = (".whl", ".zip", ".tar", ".tar.gz", ".tgz")
+"""Modules ending in one of these are read straight out of the archive."""
+
+SKIPPED_PACKAGES = {"test", "tests", "testing", "doc", "docs", "example", "examples", "benchmarks"}
+"""Packages of an archive that are never picked as the documented package on their own."""
+
+class SourceProvider(ABC):
+    """Where the python files of a module are read from.
+
+    `name` is the path of the module in the tree and every file is named by its path in the tree,
+    which starts with `name`. The provider maps those paths to wherever the files actually are.
+    """
+
+    name: str
+
+    @abstractmethod
+    def files(
+        self,
+        *,
+        include: Iterable[str] | None = None,
+        exclude: Iterable[str] | None = None,
+        gitignore: bool = True,
+        ignore: Iterable[str] = (),
+    ) -> list[Path]:
+        """The sorted paths of the python files of the module. See `padi.discover.discover` for
+        the filter rules.
+        """
+
+    @abstractmethod
+    def read(self, path: Path) -> str:
+        """The source of a file."""
+
+    @abstractmethod
+    def stat(self, path: Path) -> tuple[int, int]:
+        """The size of a file and a modification time in nanoseconds. Used to tell whether a cached
+        model of the file is still valid without reading it.
+        """
+
+    @abstractmethod
+    def key(self, path: Path) -> str:
+        """Identifies a file across runs and modules, for example its absolute path."""
+
+class DirectoryProvider(SourceProvider):
+    """A module that is a directory on disk. `base` is the directory the module is in, which
+    is the working directory unless the module is an installed package.
+    """
+
+    def __init__(self, name: str, base: str | Path = "") -> None:
+        self.name = name
+        self.base = Path(base)
+
+    def files(
+        self,
+        *,
+        include: Iterable[str] | None = None,
+        exclude: Iterable[str] | None = None,
+        gitignore: bool = True,
+        ignore: Iterable[str] = (),
+    ) -> list[Path]:
+        files = discover(
+            self.base.joinpath(self.name),
+            include=include,
+            exclude=exclude,
+            gitignore=gitignore,
+            ignore=ignore,
+        )
+        return [file.relative_to(self.base) for file in files]
+
+    def read(self, path: Path) -> str:
+        return read_source(self.base.joinpath(path))
+
+    def stat(self, path: Path) -> tuple[int, int]:
+        stat = self.base.joinpath(path).stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    def key(self, path: Path) -> str:
+        return self.base.joinpath(path).resolve().as_posix()
+
+class _ArchiveProvider(SourceProvider):
+    """A package inside of an archive. `package` is the path of the package's directory in the
+    archive and is found from the archive's `__init__.py` files if it isn't given.
+
+    Archives are opened lazily and only their path is pickled, so a provider is cheap to send to
+    worker processes which open the archive themselves the first time they read from it.
+    """
+
+    _archive: object | None
+
+    def __init__(self, path: str | Path, package: str = "") -> None:
+        self.path = Path(path)
+        self.mtime = self.path.stat().st_mtime_ns
+        self._archive = None
+        self.sizes = self._members()
+
+        self.package = package.strip("/") or _find_package(self.path, self.sizes)
+        if f"{self.package}/__init__.py" not in self.sizes:
+            raise ValueError(f"{self.package!r} is not a python package in {str(self.path)!r}")
+        self.name = PurePosixPath(self.package).name
+
+    @abstractmethod
+    def _members(self) -> dict[str, int]:
+        """The size of every python file of the archive keyed by its path in the archive."""
+
+    @abstractmethod
+    def _read_member(self, member: str) -> bytes:
+        """The content of a file of the archive by its path in the archive."""
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        state["_archive"] = None
+        return state
+
+    def _member(self, path: Path) -> str:
+        relative = path.as_posix()[len(self.name) + 1:]
+        return f"{self.package}/{relative}"
+
+    def files(
+        self,
+        *,
+        include: Iterable[str] | None = None,
+        exclude: Iterable[str] | None = None,
+        gitignore: bool = True,
+        ignore: Iterable[str] = (),
+    ) -> list[Path]:
+        prefix = self.package + "/"
+        relative = [member[len(prefix):] for member in self.sizes if member.startswith(prefix)]
+        files = select(relative, include=include, exclude=exclude, ignore=ignore)
+        return [Path(self.name, file) for file in files]
+
+    def read(self, path: Path) -> str:
+        try:
+            return self._read_member(self._member(path)).decode("utf-8")
+        except KeyError as error:
+            raise FileNotFoundError(f"{self._member(path)!r} is not in {self.path}") from error
+
+    def stat(self, path: Path) -> tuple[int, int]:
+        # A rebuilt archive has a new mtime so every member is checked against its content hash
+        return self.sizes[self._member(path)], self.mtime
+
+    def key(self, path: Path) -> str:
+        return f"{self.path.resolve().as_posix()}/{self._member(path)}"
+
+class ZipProvider(_ArchiveProvider):
+    """A package inside of a wheel or zip archive. Files are listed from the archive's central
+    directory and each member is inflated straight into memory when it is read, nothing is
+    extracted to disk.
+    """
+
+    _archive: zipfile.ZipFile | None
+
+    def _members(self) -> dict[str, int]:
+        with zipfile.ZipFile(self.path) as archive:
+            return {
+                info.filename: info.file_size
+                for info in archive.infolist()
+                if info.filename.endswith(".py") and not info.is_dir()
+            }
+
+    def _read_member(self, member: str) -> bytes:
+        if self._archive is None:
+            self._archive = zipfile.ZipFile(self.path)
+        return self._archive.read(member)
+
+class TarProvider(_ArchiveProvider):
+    """A package inside of a tar archive like an sdist. A compressed tar can only be read from the
+    start, so the whole archive is streamed once and every python file is kept in memory instead
+    of seeking back to each member as it is read.
+    """
+
+    _archive: dict[str, bytes] | None
+
+    def _members(self) -> dict[str, int]:
+        self._archive = self._load()
+        return {member: len(data) for member, data in self._archive.items()}
+
+    def _load(self) -> dict[str, bytes]:
+        contents = {}
+        with tarfile.open(self.path, "r|*") as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith(".py"):
+                    file = archive.extractfile(member)
+                    if file is not None:
+                        contents[member.name.removeprefix("./")] = file.read()
+        return contents
+
+    def _read_member(self, member: str) -> bytes:
+        if self._archive is None:
+            self._archive = self._load()
+        return self._archive[member]
+
+def _find_package(path: Path, members: Iterable[str]) -> str:
+    """The top most package of an archive. Test, doc, and example packages are skipped."""
+
+    packages = {
+        member.rpartition("/")[0]
+        for member in members
+        if member.endswith("/__init__.py")
+    }
+    top = [
+        package
+        for package in packages
+        if package.rpartition("/")[0] not in packages
+        and package.rpartition("/")[2] not in SKIPPED_PACKAGES
+    ]
+    if len(top) == 0:
+        raise ValueError(f"{str(path)!r} doesn't contain a python package")
+
+    depth = min(package.count("/") for package in top)
+    shallowest = sorted(package for package in top if package.count("/") == depth)
+    if len(shallowest) > 1:
+        raise ValueError(
+            f"{str(path)!r} contains more than one package: {', '.join(shallowest)}. Pick one "
+            f"with '{path}:<package>'."
+        )
+    return shallowest[0]
+
+def installed(name: str) -> DirectoryProvider:
+    """The installed package with the given import name, for example in site-packages. The
+    package is found without being imported.
+    """
+
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        spec = None
+    if spec is None or spec.submodule_search_locations is None:
+        raise ValueError(f"{name!r} is not a directory, archive, or installed package")
+
+    locations = list(spec.submodule_search_locations)
+    if len(locations) == 0:
+        raise ValueError(f"{name!r} is not a directory, archive, or installed package")
+
+    # The base is the directory the top level package is in so the tree starts at it
+    depth = name.count(".") + 1
+    location = Path(locations[0])
+    return DirectoryProvider(
+        "/".join(location.parts[-depth:]),
+        Path(*location.parts[:-depth]),
+    )
+
+def open_provider(module: str) -> SourceProvider:
+    """The provider of a module given on the command line.
+
+    - A directory is read from disk the same as always.
+    - A `.whl`, `.zip`, `.tar`, `.tar.gz`, or `.tgz` archive is read without extracting it. The
+      package is found from the archive's `__init__.py` files or picked with
+      `archive.tar.gz:path/in/archive`.
+    - Anything else is looked up as the import name of an installed package, for example `click`
+      or `email.mime`.
+    """
+
+    lowered = module.lower()
+    if not lowered.endswith(ARCHIVE_SUFFIXES) and ":" in module:
+        archive, _, package = module.rpartition(":")
+        if archive.lower().endswith(ARCHIVE_SUFFIXES):
+            module, lowered = archive, archive.lower()
+        else:
+            package = ""
+    else:
+        package = ""
+
+    if lowered.endswith(ARCHIVE_SUFFIXES):
+        if lowered.endswith((".whl", ".zip")):
+            return ZipProvider(module, package)
+        return TarProvider(module, package)
+
+    if module == "" or os.path.exists(module) or "/" in module or os.sep in module:
+        return DirectoryProvider(module)
+    return installed(module)
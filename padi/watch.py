@@ -0,0 +1,216 @@
+from __future__ import annotations
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import sys
+from threading import Thread
+from time import perf_counter, sleep
+from typing import Iterable
+
+from .cache import ParseCache
+from .compile.documentation import build_docs
+from .parse import construct_module, find_files
+
+__all__ = [
+    "PreviewServer",
+    "watch"
+]
+
+RELOAD_PATH = "/__padi__/build"
+"""Path the preview server reports the current build number at."""
+
+RELOAD_SCRIPT = f"""\
+<script>
+(function () {{
+    var build = null;
+    setInterval(function () {{
+        fetch("{RELOAD_PATH}", {{ cache: "no-store" }})
+            .then(function (response) {{ return response.text(); }})
+            .then(function (current) {{
+                if (build !== null && current !== build) {{ location.reload(); }}
+                build = current;
+            }})
+            .catch(function () {{}});
+    }}, 500);
+}})();
+</script>
+"""
+"""Injected into served pages so they reload after every rebuild."""
+
+class _PreviewHandler(SimpleHTTPRequestHandler):
+    server: PreviewServer
+
+    def translate_path(self, path: str) -> str:
+        prefix = self.server.prefix
+        if prefix != "" and (path == prefix or path.startswith(prefix + "/")):
+            path = path[len(prefix):] or "/"
+        return super().translate_path(path)
+
+    def do_GET(self):
+        if self.path.split("?")[0] == RELOAD_PATH:
+            self._send(str(self.server.build).encode("utf-8"), "text/plain")
+            return
+
+        path = Path(self.translate_path(self.path))
+        if path.is_dir() and self.path.split("?")[0].endswith("/"):
+            path = path.joinpath("index.html")
+
+        if path.suffix == ".html" and path.is_file():
+            content = path.read_text(encoding="utf-8")
+            if "</body>" in content:
+                content = content.replace("</body>", RELOAD_SCRIPT + "</body>", 1)
+            else:
+                content += RELOAD_SCRIPT
+            self._send(content.encode("utf-8"), "text/html; charset=utf-8")
+            return
+
+        super().do_GET()
+
+    def _send(self, content: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args):
+        pass
+
+class PreviewServer(ThreadingHTTPServer):
+    """Serves the built docs on localhost. Pages reload themselves whenever `reload` is called."""
+
+    daemon_threads = True
+
+    def __init__(self, out: str | Path, *, root: str = "", port: int = 8000) -> None:
+        super().__init__(("localhost", port), partial(_PreviewHandler, directory=str(out)))
+        self.prefix = "/" + root.replace("\\", "/").strip("/") if root.strip("/") != "" else ""
+        self.build = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://localhost:{self.server_address[1]}{self.prefix}/"
+
+    def start(self):
+        Thread(target=self.serve_forever, daemon=True).start()
+
+    def reload(self):
+        self.build += 1
+
+def _snapshot(module: str, user_templates: str, filters: dict) -> dict[Path, tuple[int, int]]:
+    """Size and mtime of every watched file."""
+
+    watched = find_files(module, **filters)
+    if user_templates != "":
+        watched.extend(file for file in Path(user_templates).glob("**/*") if file.is_file())
+
+    snapshot = {}
+    for file in watched:
+        try:
+            stat = file.stat()
+        except OSError:
+            continue
+        snapshot[file] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+def watch(
+    module: str,
+    project: str,
+    *,
+    out: str = "docs/",
+    root: str = "",
+    user_templates: str = "",
+    cache_dir: str = "",
+    jobs: int = 1,
+    low_memory: bool = False,
+    include: Iterable[str] | None = None,
+    exclude: Iterable[str] | None = None,
+    gitignore: bool = True,
+    rebuild: bool = True,
+    serve: bool = False,
+    port: int = 8000,
+    interval: float = 0.5,
+):
+    """Build the docs and then keep them up to date.
+
+    The package and layouts directories are polled for changes. Changed files are parsed again
+    and patched into the same in memory module tree before only the affected pages are rebuilt.
+    With `serve` the docs are also served on localhost and open pages reload after each rebuild.
+    """
+
+    filters = {"include": include, "exclude": exclude, "gitignore": gitignore}
+    tree = construct_module(
+        module,
+        cache_dir=cache_dir,
+        jobs=jobs,
+        include=include,
+        exclude=exclude,
+        gitignore=gitignore,
+    )
+    cache = ParseCache(cache_dir) if cache_dir != "" else None
+    build = partial(
+        build_docs,
+        tree,
+        project,
+        out=out,
+        root=root,
+        user_templates=user_templates,
+        incremental=True,
+        jobs=jobs,
+        cache_dir=cache_dir,
+        low_memory=low_memory,
+    )
+    build()
+
+    server = None
+    if serve:
+        server = PreviewServer(out, root=root, port=port)
+        server.start()
+        print(f"Serving docs at {server.url}", file=sys.stderr)
+
+    try:
+        previous = _snapshot(module, user_templates, filters)
+        while rebuild:
+            sleep(interval)
+            current = _snapshot(module, user_templates, filters)
+            changed = {
+                file
+                for file in previous.keys() | current.keys()
+                if previous.get(file) != current.get(file)
+            }
+            previous = current
+            if len(changed) == 0:
+                continue
+
+            start = perf_counter()
+            for file in sorted(changed):
+                if file.suffix != ".py" or not file.is_relative_to(module):
+                    continue
+                tree.remove(file)
+                if file in current:
+                    try:
+                        tree.add(file, cache)
+                    except (SyntaxError, UnicodeDecodeError) as error:
+                        print(f"Skipping {file.as_posix()!r}: {error}", file=sys.stderr)
+
+            try:
+                build()
+            except Exception as error:
+                print(f"Rebuild failed: {error}", file=sys.stderr)
+                continue
+
+            print(
+                f"Rebuilt {len(changed)} changed file(s) in {perf_counter() - start:.2f}s",
+                file=sys.stderr,
+            )
+            if server is not None:
+                server.reload()
+
+        while server is not None:
+            sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
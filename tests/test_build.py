@@ -0,0 +1,44 @@
+from __future__ import annotations
+from pathlib import Path
+import shutil
+
+import pytest
+
+from padi.parse import construct_module
+
+documentation = pytest.importorskip(
+    "padi.compile.documentation",
+    reason="needs a phml release with the PHML api",
+    exc_type=ImportError,
+)
+
+EXAMPLE = Path(__file__).parent.parent.joinpath("playground", "example", "sample_module")
+
+def test_single_package_build_over_multi_package_output(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    shutil.copytree(EXAMPLE, tmp_path.joinpath("sample_module"))
+    shutil.copytree(EXAMPLE, tmp_path.joinpath("other", "otherpkg"))
+    monkeypatch.chdir(tmp_path)
+    out = tmp_path.joinpath("out")
+
+    documentation.build_packages(
+        [
+            documentation.Package(construct_module("sample_module")),
+            documentation.Package(construct_module("other/otherpkg")),
+        ],
+        out=str(out),
+        incremental=True,
+    )
+    assert out.joinpath("otherpkg").is_dir()
+
+    documentation.build_docs(
+        construct_module("sample_module"),
+        "sample_module",
+        out=str(out),
+        incremental=True,
+    )
+    assert out.joinpath("index.html").is_file()
+    assert not out.joinpath("sample_module").exists()
+    assert not out.joinpath("otherpkg").exists()
@@ -0,0 +1,21 @@
+from __future__ import annotations
+from pathlib import Path
+
+import pytest
+
+from padi.nodes.docstrings import DocstringCache
+
+def test_save_keeps_the_most_recently_used(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("padi.nodes.docstrings.MAX_ENTRIES", 2)
+    path = tmp_path.joinpath("docstrings.pickle")
+
+    cache = DocstringCache()
+    cache.load(path)
+    for content in ["first", "second", "third"]:
+        cache.render(content)
+    cache.render("first")
+    cache.save()
+
+    loaded = DocstringCache()
+    loaded.load(path)
+    assert set(loaded.entries) == {cache.key("third"), cache.key("first")}
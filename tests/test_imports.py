@@ -0,0 +1,42 @@
+from __future__ import annotations
+from pathlib import Path
+
+import pytest
+
+from padi.imports import ImportGraph
+from padi.parse import construct_module
+
+@pytest.fixture
+def graph(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> ImportGraph:
+    sources = {
+        "pk/__init__.py": "from . import a\n",
+        "pk/a.py": "import pk.sub.b\n",
+        "pk/sub/__init__.py": "",
+        "pk/sub/b.py": "import os\n",
+    }
+    for path, source in sources.items():
+        tmp_path.joinpath(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.joinpath(path).write_text(source)
+    monkeypatch.chdir(tmp_path)
+    return ImportGraph(construct_module("pk"))
+
+def test_edges(graph: ImportGraph):
+    assert graph.edges["pk.a"] == ["pk.sub.b"]
+    assert graph.external["pk.sub.b"] == ["os"]
+    assert graph.package == {"pk": None, "pk.a": "pk", "pk.sub": "pk", "pk.sub.b": "pk.sub"}
+
+def test_loads_include_parent_packages(graph: ImportGraph):
+    loads = graph.loads()
+    # pk.sub.b along with pk and pk.sub which run before it
+    assert loads["pk.a"] == 3
+    # pk runs pk.a which imports pk.sub.b
+    assert loads["pk.sub.b"] == 3
+    assert loads["pk.sub"] == 3
+    assert loads["pk"] == 3
+
+def test_packages_are_imported_by_their_files(graph: ImportGraph):
+    assert sorted(graph.importers("pk")) == ["pk.a", "pk.sub"]
+    assert graph.importers("pk.sub.b") == ["pk.a"]
+
+def test_packages_importing_their_files_are_not_cycles(graph: ImportGraph):
+    assert graph.cycles() == []
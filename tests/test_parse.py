@@ -0,0 +1,52 @@
+from __future__ import annotations
+from pathlib import Path
+import shutil
+
+import pytest
+
+from padi.nodes.file_system import parse_counts
+from padi.parse import construct_module
+
+EXAMPLE = Path(__file__).parent.parent.joinpath("playground", "example", "sample_module")
+
+@pytest.fixture
+def package(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    shutil.copytree(EXAMPLE, tmp_path.joinpath("sample_module"))
+    monkeypatch.chdir(tmp_path)
+    parse_counts.clear()
+    yield "sample_module"
+    parse_counts.clear()
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_every_file_is_parsed_once(package: str, jobs: int):
+    root = construct_module(package, jobs=jobs)
+
+    files = [file.full_path for file in root.all_files()]
+    assert len(files) > 1
+    assert dict(parse_counts) == {file: 1 for file in files}
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_warm_cache_parses_nothing(package: str, jobs: int, tmp_path: Path):
+    cache_dir = str(tmp_path.joinpath("cache"))
+    construct_module(package, cache_dir=cache_dir, jobs=jobs)
+    parse_counts.clear()
+
+    root = construct_module(package, cache_dir=cache_dir, jobs=jobs)
+
+    files = [file.full_path for file in root.all_files()]
+    assert len(files) > 1
+    assert all(parse_counts[file] == 0 for file in files)
+
+def test_cache_entries_of_another_format_are_parsed_again(
+    package: str,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    cache_dir = str(tmp_path.joinpath("cache"))
+    construct_module(package, cache_dir=cache_dir)
+    parse_counts.clear()
+
+    monkeypatch.setattr("padi.cache.CACHE_FORMAT", -1)
+    root = construct_module(package, cache_dir=cache_dir)
+
+    assert all(parse_counts[file.full_path] == 1 for file in root.all_files())
@@ -0,0 +1,24 @@
+from __future__ import annotations
+from pathlib import Path
+
+import pytest
+
+from padi.parse import construct_module
+
+references = pytest.importorskip(
+    "padi.compile.documentation.references",
+    reason="needs a phml release with the PHML api",
+    exc_type=ImportError,
+)
+
+EXAMPLE = Path(__file__).parent.parent.joinpath("playground", "example", "sample_module")
+
+def test_targets_are_site_relative(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(EXAMPLE.parent)
+    table = references.References(construct_module(EXAMPLE.name))
+
+    assert table.targets[EXAMPLE.name] == "/"
+    assert len(table.targets) > 1
+    for target in table.targets.values():
+        assert target.startswith("/")
+        assert not target.startswith("//")
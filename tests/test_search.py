@@ -0,0 +1,25 @@
+from __future__ import annotations
+from pathlib import Path
+
+import pytest
+
+from padi.parse import construct_module
+
+search = pytest.importorskip(
+    "padi.compile.documentation.search",
+    reason="needs a phml release with the PHML api",
+    exc_type=ImportError,
+)
+
+EXAMPLE = Path(__file__).parent.parent.joinpath("playground", "example", "sample_module")
+
+@pytest.mark.parametrize("root, prefix", [("", "/"), ("/docs", "/docs/")])
+def test_hrefs_are_site_relative(monkeypatch: pytest.MonkeyPatch, root: str, prefix: str):
+    monkeypatch.chdir(EXAMPLE.parent)
+    index = search.SearchIndex(construct_module(EXAMPLE.name), root)
+
+    hrefs = {path: href for path, href, *_ in index.docs}
+    assert hrefs[EXAMPLE.name] == prefix
+    for href in hrefs.values():
+        assert href.startswith(prefix)
+        assert not href.startswith("//")
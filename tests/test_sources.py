@@ -0,0 +1,37 @@
+from __future__ import annotations
+from pathlib import Path
+import zipfile
+
+import pytest
+
+from padi.sources import SourceProvider, ZipProvider, _ArchiveProvider, open_provider
+
+EXAMPLE = Path(__file__).parent.parent.joinpath("playground", "example", "sample_module")
+
+def test_providers_must_implement_every_method():
+    class Partial(SourceProvider):
+        def read(self, path: Path) -> str:
+            return ""
+
+    class PartialArchive(_ArchiveProvider):
+        def _members(self) -> dict[str, int]:
+            return {}
+
+    with pytest.raises(TypeError):
+        Partial()
+    with pytest.raises(TypeError):
+        PartialArchive("missing.zip")
+
+def test_wheel_has_the_files_of_the_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(EXAMPLE.parent)
+    wheel = tmp_path.joinpath("sample_module-1.0-py3-none-any.whl")
+    with zipfile.ZipFile(wheel, "w") as archive:
+        for path in EXAMPLE.glob("**/*.py"):
+            archive.write(path, path.relative_to(EXAMPLE.parent).as_posix())
+
+    directory = open_provider(EXAMPLE.name)
+    provider = open_provider(str(wheel))
+    assert isinstance(provider, ZipProvider)
+    assert provider.files(ignore=["__main__.py"]) == directory.files(ignore=["__main__.py"])
+    for file in provider.files():
+        assert provider.read(file) == directory.read(file)